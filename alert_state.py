@@ -0,0 +1,194 @@
+# alert_state.py
+"""
+Shared alert-engine state: per-type threshold counters, notification
+cooldowns and the latest registered driver.
+
+Two interchangeable backends:
+  - SQLiteAlertState (default) keeps everything in the app database using
+    atomic UPSERTs, so every gunicorn worker / process sees the same
+    counters and cooldowns.
+  - MemoryAlertState keeps it in process memory (single process only,
+    slightly cheaper).
+
+Pick one with ALERT_STATE_BACKEND=sqlite|memory.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+
+class AlertStateBackend:
+    """Interface shared by the backends below."""
+
+    def increment(self, alert_type: str, threshold: int):
+        """
+        Atomically bump the counter for alert_type. Returns (count, triggered);
+        when count reaches threshold the stored counter is reset to 0.
+        """
+        raise NotImplementedError
+
+    def counts(self, alert_types) -> dict:
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def acquire_cooldown(self, key: str, seconds: float) -> bool:
+        """Claim a notification slot for key unless one was claimed < seconds ago."""
+        raise NotImplementedError
+
+    def release_cooldown(self, key: str):
+        raise NotImplementedError
+
+    def set_latest_user(self, user_id: str):
+        raise NotImplementedError
+
+    def get_latest_user(self):
+        raise NotImplementedError
+
+
+class MemoryAlertState(AlertStateBackend):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._cooldowns = {}
+        self._latest_user = None
+
+    def increment(self, alert_type, threshold):
+        with self._lock:
+            count = self._counts.get(alert_type, 0) + 1
+            triggered = count >= threshold
+            self._counts[alert_type] = 0 if triggered else count
+        return count, triggered
+
+    def counts(self, alert_types):
+        with self._lock:
+            return {t: self._counts.get(t, 0) for t in alert_types}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+    def acquire_cooldown(self, key, seconds):
+        now = time.time()
+        with self._lock:
+            if now - self._cooldowns.get(key, 0) < seconds:
+                return False
+            self._cooldowns[key] = now
+            return True
+
+    def release_cooldown(self, key):
+        with self._lock:
+            self._cooldowns.pop(key, None)
+
+    def set_latest_user(self, user_id):
+        self._latest_user = user_id
+
+    def get_latest_user(self):
+        return self._latest_user
+
+
+class SQLiteAlertState(AlertStateBackend):
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS alert_state_counters (
+                alert_type TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS alert_state_cooldowns (
+                key TEXT PRIMARY KEY,
+                last_sent REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS alert_state_kv (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+
+    def _conn(self):
+        # One autocommit connection per thread; transactions are explicit
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=10)
+            conn.execute("PRAGMA busy_timeout = 10000;")
+            self._local.conn = conn
+        return conn
+
+    def increment(self, alert_type, threshold):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (count,) = conn.execute(
+                """
+                INSERT INTO alert_state_counters (alert_type, count) VALUES (?, 1)
+                ON CONFLICT(alert_type) DO UPDATE SET count = count + 1
+                RETURNING count
+                """,
+                (alert_type,),
+            ).fetchone()
+            triggered = count >= threshold
+            if triggered:
+                conn.execute(
+                    "UPDATE alert_state_counters SET count = 0 WHERE alert_type = ?",
+                    (alert_type,),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return count, triggered
+
+    def counts(self, alert_types):
+        rows = self._conn().execute("SELECT alert_type, count FROM alert_state_counters")
+        stored = dict(rows.fetchall())
+        return {t: stored.get(t, 0) for t in alert_types}
+
+    def reset(self):
+        self._conn().execute("UPDATE alert_state_counters SET count = 0")
+
+    def acquire_cooldown(self, key, seconds):
+        now = time.time()
+        row = self._conn().execute(
+            """
+            INSERT INTO alert_state_cooldowns (key, last_sent) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET last_sent = excluded.last_sent
+            WHERE alert_state_cooldowns.last_sent <= ?
+            RETURNING key
+            """,
+            (key, now, now - seconds),
+        ).fetchone()
+        return row is not None
+
+    def release_cooldown(self, key):
+        self._conn().execute("DELETE FROM alert_state_cooldowns WHERE key = ?", (key,))
+
+    def set_latest_user(self, user_id):
+        self._conn().execute(
+            """
+            INSERT INTO alert_state_kv (key, value) VALUES ('latest_user_id', ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+            (user_id,),
+        )
+
+    def get_latest_user(self):
+        row = self._conn().execute(
+            "SELECT value FROM alert_state_kv WHERE key = 'latest_user_id'"
+        ).fetchone()
+        return row[0] if row else None
+
+
+def create_backend(db_path, kind=None):
+    kind = (kind or os.getenv("ALERT_STATE_BACKEND", "sqlite")).lower()
+    if kind == "memory":
+        return MemoryAlertState()
+    if kind == "sqlite":
+        return SQLiteAlertState(db_path)
+    raise ValueError(f"Unknown ALERT_STATE_BACKEND: {kind}")
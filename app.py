@@ -1,30 +1,63 @@
 # app.py
-from flask import Flask, render_template, Response, jsonify, request
-from detection.detect_drowsiness import gen_frames
+from flask import (
+    Flask,
+    render_template,
+    Response,
+    jsonify,
+    request,
+    g,
+    stream_with_context,
+)
 from state import (
-    alert_counts,
+    alert_state,
+    get_alert_counts as get_shared_alert_counts,
     log_alert,
     get_driver_name,
+    get_user_profile,
     reset_alert_counts,
     ALERT_THRESHOLD,  # ✅ Use this constant for the threshold value
+    ALERT_TYPES,
 )
 from flask_cors import CORS
 from email_utils import send_email_notification, compose_alert_message
+import csv
 import sqlite3
 import uuid
+import io
+import json
+import math
 import os
+import threading
 import time
-import requests
+from datetime import datetime
+import blockchain_client
+import chain_indexer
+import retention
+import ingest
+from detection import telemetry
+import webhooks
 from blockchain_client import log_alert as log_alert_blockchain
+from log_utils import get_logger
+import metrics
+import profiler
+from user_import import validate_user, bulk_insert, parse as parse_import
+from metrics import (
+    ALERTS_RECEIVED,
+    DB_QUERY_SECONDS,
+    EMAILS_SENT,
+    HTTP_REQUEST_SECONDS,
+    TELEMETRY_RECORDS_INGESTED,
+)
 
 app = Flask(__name__)
 CORS(app)
+log = get_logger("app")
 
 # ------------------- Database Config -------------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_DIR = os.path.join(BASE_DIR, "database")
 os.makedirs(DB_DIR, exist_ok=True)
-DB_PATH = os.path.join(DB_DIR, "driver_drowsiness.db")
+DB_PATH = os.getenv("DB_PATH", os.path.join(DB_DIR, "driver_drowsiness.db"))
 
 
 def get_db_connection():
@@ -61,16 +94,41 @@ def create_tables_if_not_exist():
     );
     """
     )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_contacts_user_id ON contacts(user_id);")
+    c.execute(
+        """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        end_time TIMESTAMP,
+        is_active INTEGER DEFAULT 1,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    );
+    """
+    )
+    c.execute(
+        """
+    CREATE TABLE IF NOT EXISTS alerts (
+        id TEXT PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        alert_type TEXT NOT NULL,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        count INTEGER DEFAULT 1,
+        FOREIGN KEY(session_id) REFERENCES sessions(id)
+    );
+    """
+    )
     conn.commit()
     conn.close()
-    print("[DB] Ensured tables exist at:", DB_PATH)
+    log.info("ensured tables exist", extra={"db_path": DB_PATH})
 
 
 def add_user_to_db(user_info, contacts):
     conn = get_db_connection()
     c = conn.cursor()
     user_id = str(uuid.uuid4())
-    print("[add_user_to_db] Inserting user:", user_info)
+    log.debug("inserting user", extra={"user_id": user_id})
     try:
         c.execute(
             """
@@ -88,7 +146,6 @@ def add_user_to_db(user_info, contacts):
 
         for contact in contacts:
             contact_id = str(uuid.uuid4())
-            print("[add_user_to_db] Inserting contact:", contact)
             c.execute(
                 """
                 INSERT INTO contacts (id, user_id, name, relation, email, phone)
@@ -104,10 +161,10 @@ def add_user_to_db(user_info, contacts):
                 ),
             )
         conn.commit()
-        print("[add_user_to_db] Commit successful.")
+        log.info("user added", extra={"user_id": user_id, "contacts": len(contacts)})
     except Exception as db_err:
         conn.rollback()
-        print("[add_user_to_db] ERROR while inserting into DB:", db_err)
+        log.error("error inserting user", extra={"error": str(db_err)})
         raise
     finally:
         conn.close()
@@ -116,33 +173,104 @@ def add_user_to_db(user_info, contacts):
 
 # ------------------- Get User + Contacts -------------------
 def get_contacts_for_user(user_id: str):
-    conn = get_db_connection()
-    c = conn.cursor()
-    try:
-        c.execute("SELECT full_name FROM users WHERE id = ?", (user_id,))
-        user_row = c.fetchone()
-        if not user_row:
-            return None, []
-
-        driver_name = user_row["full_name"]
-
-        c.execute("SELECT name, email FROM contacts WHERE user_id = ?", (user_id,))
-        contacts = [
-            {"name": row["name"], "email": row["email"]} for row in c.fetchall()
-        ]
-        return driver_name, contacts
-    finally:
-        conn.close()
+    # Shares the cached profile with state.get_driver_name
+    profile = get_user_profile(user_id)
+    if not profile:
+        return None, []
+    return profile
 
 
 # ------------------- Initialization -------------------
 create_tables_if_not_exist()
 
-latest_user_id = None  # ✅ Track most recent user
-EMAILS_SENT_COUNT = 0  # ✅ Track total number of sent emails
+_init_conn = sqlite3.connect(DB_PATH)
+chain_indexer.ensure_tables(_init_conn)
+retention.ensure_tables(_init_conn)
+telemetry.ensure_tables(_init_conn)
+_init_conn.close()
+
+# Follow the chain into chain_alerts in the background (one process only)
+if os.getenv("CHAIN_INDEXER_ENABLED", "0") == "1":
+    chain_indexer.start_background()
 
+# Deliver webhook rows left pending or retrying by a previous run; claims are
+# leases, so every worker process can run a dispatcher
+webhooks.get_dispatcher()
+
+# Move alerts past ALERT_RETENTION_DAYS into the monthly archive (one process only)
+if os.getenv("ALERT_RETENTION_ENABLED", "0") == "1":
+    retention.start_background(
+        DB_PATH, int(os.getenv("ALERT_RETENTION_INTERVAL_SECONDS", "3600"))
+    )
+
+
+# Latest registered driver and per-(user, alert type) email cooldowns live in
+# state.alert_state so they are shared by every worker process.
 COOL_DOWN_SECONDS = 10 * 60  # 10 minutes
-_last_notification_time = {}  # cooldown dictionary
+
+LIST_USERS_DEFAULT_LIMIT = 100
+LIST_USERS_MAX_LIMIT = 1000
+TELEMETRY_MAX_UPLOAD_BYTES = 16 * 1024 * 1024
+
+
+# ------------------- Lazy Detector -------------------
+# Importing the detector builds the landmark backend (FaceMesh by default), so it
+# is deferred until /video_feed (or the optional DETECTOR_WARMUP thread).
+_detector = None
+_detector_state = "cold"  # cold -> warming -> ready | failed
+_detector_lock = threading.Lock()
+
+
+def get_detector():
+    global _detector, _detector_state
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector_state = "warming"
+                t0 = time.perf_counter()
+                try:
+                    from detection import detect_drowsiness
+                except Exception:
+                    _detector_state = "failed"
+                    log.exception("detector failed to load")
+                    raise
+                _detector = detect_drowsiness
+                _detector_state = "ready"
+                log.info(
+                    "detector ready",
+                    extra={"load_seconds": round(time.perf_counter() - t0, 3)},
+                )
+    return _detector
+
+
+def _warm_up_detector():
+    try:
+        get_detector()
+    except Exception:
+        pass  # state is "failed" and already logged
+
+
+if os.getenv("DETECTOR_WARMUP", "0") == "1":
+    threading.Thread(target=_warm_up_detector, name="detector-warmup", daemon=True).start()
+
+
+# ------------------- Request Metrics -------------------
+@app.before_request
+def _start_timer():
+    g.start_time = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    start = g.get("start_time")
+    # /video_feed streams forever; its latency is meaningless here
+    if start is not None and request.endpoint != "video_feed":
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint=request.endpoint or "unknown",
+            status=response.status_code,
+        )
+    return response
 
 
 # ------------------- Routes -------------------
@@ -153,12 +281,15 @@ def home():
 
 @app.route("/video_feed")
 def video_feed():
-    return Response(gen_frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
+    detector = get_detector()
+    return Response(
+        detector.gen_frames(), mimetype="multipart/x-mixed-replace; boundary=frame"
+    )
 
 
 @app.route("/get_alert_counts")
 def get_alert_counts():
-    return jsonify(alert_counts)
+    return jsonify(get_shared_alert_counts())
 
 
 @app.route("/health")
@@ -166,15 +297,65 @@ def health_check():
     return {"status": "OK"}, 200
 
 
+@app.route("/ready")
+def readiness_check():
+    """
+    Serving readiness plus subsystem warm-up state. Always 200 while the API
+    is serving; ?require=detector returns 503 until the detector is loaded.
+    """
+    body = {
+        "serving": True,
+        "detector": _detector_state,
+        "blockchain_client": blockchain_client.is_initialized(),
+    }
+    if request.args.get("require") == "detector" and _detector_state != "ready":
+        return jsonify(body), 503
+    return jsonify(body), 200
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
+
+@app.route("/debug/profile")
+def debug_profile():
+    """
+    Sample all threads for ?seconds= (default 10) and return collapsed stacks
+    for flamegraph tools. ?match=gen_frames keeps only the detection loop.
+    Disabled (404) unless PROFILER_ENABLED=1.
+    """
+    if not profiler.PROFILER_ENABLED:
+        return jsonify({"error": "Profiler disabled"}), 404
+    try:
+        seconds = float(request.args.get("seconds", 10))
+        interval_ms = float(request.args.get("interval_ms", 5))
+    except ValueError:
+        seconds = interval_ms = math.nan
+    # float() accepts "nan" and "inf", which would reach time.sleep()
+    if not all(math.isfinite(v) and v > 0 for v in (seconds, interval_ms)):
+        return jsonify({"error": "seconds and interval_ms must be positive numbers"}), 400
+    interval = interval_ms / 1000.0
+
+    try:
+        counts = profiler.sample(seconds, interval, match=request.args.get("match"))
+    except profiler.ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+
+    return Response(
+        profiler.collapse(counts),
+        mimetype="text/plain",
+        headers={"Content-Disposition": "attachment; filename=profile.collapsed"},
+    )
+
+
 @app.route("/add_user", methods=["POST"])
 def add_user():
-    global latest_user_id
-    print("[/add_user] Request. DB_PATH:", DB_PATH)
     if not request.is_json:
         return jsonify({"status": "error", "message": "Expected JSON payload"}), 400
 
     data = request.get_json()
-    print("[/add_user] Payload:", data)
 
     if not data or "user_info" not in data or "contacts" not in data:
         return jsonify({"status": "error", "message": "Invalid payload"}), 400
@@ -182,57 +363,197 @@ def add_user():
     user_info = data["user_info"]
     contacts = data["contacts"]
 
-    required_fields = ("full_name", "age", "email", "phone")
-    if not all(user_info.get(k) for k in required_fields):
-        return jsonify({"status": "error", "message": "User info fields missing"}), 400
-    if not isinstance(contacts, list) or len(contacts) < 1:
-        return (
-            jsonify(
-                {
-                    "status": "error",
-                    "message": "At least one emergency contact required",
-                }
-            ),
-            400,
-        )
+    error = validate_user(user_info, contacts)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
 
     try:
         user_id = add_user_to_db(user_info, contacts)
-        latest_user_id = user_id
-        print(f"[app.py] ✅ Latest active user set to {latest_user_id}")
+        alert_state.set_latest_user(user_id)
+        log.info("latest active user set", extra={"user_id": user_id})
         return jsonify({"status": "success", "user_id": user_id}), 201
     except Exception as e:
-        print("[/add_user] Exception while inserting:", e)
+        log.error("add_user failed", extra={"error": str(e)})
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
 @app.route("/list_users", methods=["GET"])
 def list_users():
+    """
+    Keyset-paginated users with their contacts nested:
+    /list_users?limit=100&after=<next_cursor from the previous page>
+    """
+    try:
+        limit = int(request.args.get("limit", LIST_USERS_DEFAULT_LIMIT))
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit must be a number"}), 400
+    limit = min(max(limit, 1), LIST_USERS_MAX_LIMIT)
+    after = request.args.get("after", "")
+
     conn = get_db_connection()
-    users = [dict(row) for row in conn.execute("SELECT * FROM users").fetchall()]
-    contacts = [dict(row) for row in conn.execute("SELECT * FROM contacts").fetchall()]
-    conn.close()
-    return jsonify({"users": users, "contacts": contacts})
+    try:
+        with DB_QUERY_SECONDS.time(query="list_users"):
+            users = [
+                dict(row)
+                for row in conn.execute(
+                    "SELECT * FROM users WHERE id > ? ORDER BY id LIMIT ?", (after, limit)
+                )
+            ]
+            by_id = {u["id"]: u for u in users}
+            for u in users:
+                u["contacts"] = []
+            if users:
+                placeholders = ",".join("?" * len(users))
+                for row in conn.execute(
+                    f"SELECT * FROM contacts WHERE user_id IN ({placeholders})",
+                    list(by_id),
+                ):
+                    by_id[row["user_id"]]["contacts"].append(dict(row))
+    finally:
+        conn.close()
+
+    next_cursor = users[-1]["id"] if len(users) == limit else None
+    return jsonify({"users": users, "next_cursor": next_cursor})
+
+
+def _iter_users_with_contacts():
+    """Yield each user dict (contacts nested) in id order, streaming from SQLite."""
+    conn = get_db_connection()
+    try:
+        cur = conn.execute(
+            """
+            SELECT u.id, u.full_name, u.age, u.email, u.phone,
+                   c.id AS contact_id, c.name AS contact_name, c.relation AS contact_relation,
+                   c.email AS contact_email, c.phone AS contact_phone
+            FROM users u
+            LEFT JOIN contacts c ON c.user_id = u.id
+            ORDER BY u.id
+            """
+        )
+        current = None
+        while True:
+            rows = cur.fetchmany(1000)
+            if not rows:
+                break
+            for row in rows:
+                if current is None or current["id"] != row["id"]:
+                    if current is not None:
+                        yield current
+                    current = {
+                        k: row[k] for k in ("id", "full_name", "age", "email", "phone")
+                    }
+                    current["contacts"] = []
+                if row["contact_id"] is not None:
+                    current["contacts"].append(
+                        {
+                            "id": row["contact_id"],
+                            "user_id": row["id"],
+                            "name": row["contact_name"],
+                            "relation": row["contact_relation"],
+                            "email": row["contact_email"],
+                            "phone": row["contact_phone"],
+                        }
+                    )
+        if current is not None:
+            yield current
+    finally:
+        conn.close()
+
+
+@app.route("/export_users", methods=["GET"])
+def export_users():
+    """Stream every user with contacts as NDJSON (default) or ?format=json."""
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ("ndjson", "json"):
+        return jsonify({"status": "error", "message": "format must be ndjson or json"}), 400
+
+    def generate():
+        if fmt == "ndjson":
+            for user in _iter_users_with_contacts():
+                yield json.dumps(user) + "\n"
+            return
+        yield '{"users": ['
+        for i, user in enumerate(_iter_users_with_contacts()):
+            yield ("," if i else "") + json.dumps(user)
+        yield "]}"
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+@app.route("/import_users", methods=["POST"])
+def import_users():
+    """
+    Bulk import drivers from a CSV (text/csv) or NDJSON body; see
+    user_import.py for the formats. ?format=csv|ndjson overrides the
+    Content-Type.
+    """
+    fmt = request.args.get("format") or (
+        "csv" if request.mimetype == "text/csv" else "ndjson"
+    )
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"status": "error", "message": "format must be csv or ndjson"}), 400
+
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+    conn = get_db_connection()
+    try:
+        with DB_QUERY_SECONDS.time(query="import_users"):
+            inserted, rejected, errors = bulk_insert(conn, parse_import(lines, fmt))
+    except (UnicodeDecodeError, csv.Error) as e:
+        # The import is one transaction, so nothing was written
+        return jsonify({"status": "error", "message": f"Unreadable {fmt} body: {e}"}), 400
+    except Exception as e:
+        log.error("import_users failed", extra={"error": str(e)})
+        return jsonify({"status": "error", "message": str(e), "inserted": 0}), 500
+    finally:
+        conn.close()
+
+    log.info("users imported", extra={"inserted": inserted, "rejected": rejected})
+    return (
+        jsonify(
+            {
+                "status": "success",
+                "inserted": inserted,
+                "rejected_count": rejected,
+                "rejected": errors,
+            }
+        ),
+        200,
+    )
 
 
 # ------------------- LOG ALERT -------------------
 @app.route("/log_alert", methods=["POST"])
 def log_alert_endpoint():
-    global latest_user_id, EMAILS_SENT_COUNT
-
     data = request.get_json()
-    print("[/log_alert] Incoming alert data:", data)
+    log.debug("incoming alert", extra={"payload": data})
 
-    user_id = data.get("user_id") or latest_user_id
+    user_id = data.get("user_id") or alert_state.get_latest_user()
     alert_type = data.get("alert_type")
 
     if not user_id or not alert_type:
         return jsonify({"error": "Missing user_id or alert_type"}), 400
+    # Reject unknown types before they become a metrics label or use up tokens
+    if alert_type not in ALERT_TYPES:
+        return jsonify({"error": "Unknown alert_type", "allowed": list(ALERT_TYPES)}), 400
+
+    # Shed load early (per-driver / global rate, full write queue) with a 429
+    alert_ingest = ingest.get_ingest()
+    rejection = alert_ingest.admit(user_id)
+    if rejection is not None:
+        reason, retry_after = rejection
+        return (
+            jsonify({"error": "Too many alerts, retry later", "reason": reason}),
+            429,
+            {"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
 
+    ALERTS_RECEIVED.inc(alert_type=alert_type)
     try:
         # log_alert handles the increment and checks if the threshold is met,
-        # and resets the count if triggered is True.
-        triggered = log_alert(user_id, alert_type)
+        # and resets the count if triggered is True. The alert row itself is
+        # written by the ingest queue's batching writer.
+        triggered = log_alert(user_id, alert_type, writer=alert_ingest)
 
         # Only send summary alert if threshold exceeded
         if triggered:
@@ -250,55 +571,41 @@ def log_alert_endpoint():
             }
 
             # ---- Blockchain Logging (Non-blocking) ----
+            tx_hash = None
             try:
                 # Log the alert with the full threshold count
                 bc_response = log_alert_blockchain(
                     str(user_id), str(alert_type), count_to_log, driver_name
                 )
-                print(f"🧱 [BLOCKCHAIN] {bc_response}")
-
-                tx_hash = None
-                if isinstance(bc_response, dict):
-                    tx_hash = bc_response.get("transaction_hash")
-                elif isinstance(bc_response, str):
-                    # 🚨 FIX 2: Check for the descriptive prefix and strip it to get only the hash
-                    prefix = "Alert logged and company notified. Tx Hash:"
-                    if bc_response.startswith(prefix):
-                        tx_hash = bc_response[len(prefix) :].strip()
-                    else:
-                        tx_hash = bc_response  # Assume it's already a clean hash
+                log.info("blockchain response", extra={"response": bc_response})
+                tx_hash = bc_response.get("transaction_hash")
+            except Exception as bc_error:
+                log.warning("blockchain logging failed", extra={"error": str(bc_error)})
 
-                try:
-                    company_payload = {
-                        "driver_id": user_id,
-                        "driver_name": driver_name,
-                        "alert_type": alert_type,
-                        "alert_count": count_to_log,  # Using ALERT_THRESHOLD (e.g., 5)
+            # ---- Company webhooks (queued, batched, retried) ----
+            try:
+                webhooks.publish(
+                    {
+                        **summary_alert,
                         "tx_hash": tx_hash,
+                        "timestamp": datetime.now().isoformat(timespec="seconds"),
                     }
+                )
+            except Exception as wh_error:
+                log.warning("failed to queue company webhook", extra={"error": str(wh_error)})
 
-                    requests.post(
-                        "http://127.0.0.1:7000/company_receive",
-                        json=company_payload,
-                        timeout=3,
-                    )
-                    print("🏢 Sent alert to company dashboard")
-
-                except Exception as ce:
-                    print("⚠️ Failed to send to company dashboard:", ce)
-
-            except Exception as bc_error:
-                print(f"⚠️ Blockchain logging failed: {bc_error}")
-
-            print(
-                f"🚨 [NOTIFICATION] Alert triggered for {alert_type} (user {user_id})"
+            log.info(
+                "alert notification triggered",
+                extra={"alert_type": alert_type, "user_id": user_id},
             )
 
-            key = (user_id, alert_type)
-            now_ts = time.time()
-            last_sent = _last_notification_time.get(key, 0)
-            if now_ts - last_sent < COOL_DOWN_SECONDS:
-                print(f"⏱️ Cooldown active for {key}. Skipping email.")
+            # Claimed atomically so only one worker emails per cooldown window
+            key = f"{user_id}:{alert_type}"
+            if not alert_state.acquire_cooldown(key, COOL_DOWN_SECONDS):
+                log.info(
+                    "cooldown active, skipping email",
+                    extra={"user_id": user_id, "alert_type": alert_type},
+                )
                 return (
                     jsonify(
                         {"threshold_exceeded": True, "emails_sent": 0, "cooldown": True}
@@ -308,7 +615,8 @@ def log_alert_endpoint():
 
             driver_name, contacts = get_contacts_for_user(user_id)
             if not contacts:
-                print(f"⚠️ No contacts found for user {user_id}")
+                log.warning("no contacts found", extra={"user_id": user_id})
+                alert_state.release_cooldown(key)
                 return jsonify({"threshold_exceeded": True, "emails_sent": 0}), 200
 
             sent_count = 0
@@ -320,9 +628,7 @@ def log_alert_endpoint():
                 if success:
                     sent_count += 1
 
-            EMAILS_SENT_COUNT += sent_count  # Count all sent emails
-            _last_notification_time[key] = time.time()
-            print(f"📨 Emails sent successfully: {sent_count}")
+            log.info("emails sent", extra={"sent": sent_count, "user_id": user_id})
 
             return jsonify({"threshold_exceeded": True, "emails_sent": sent_count}), 200
 
@@ -330,7 +636,7 @@ def log_alert_endpoint():
         return jsonify({"threshold_exceeded": triggered}), 200
 
     except Exception as e:
-        print("[/log_alert] Exception:", e)
+        log.exception("log_alert failed")
         return jsonify({"error": str(e)}), 500
 
 
@@ -338,7 +644,7 @@ def log_alert_endpoint():
 @app.route("/get_total_notifications", methods=["GET"])
 def get_total_notifications():
     """Return total number of emails sent since server start (in-memory)."""
-    return jsonify({"emails_sent": EMAILS_SENT_COUNT}), 200
+    return jsonify({"emails_sent": EMAILS_SENT.value(status="sent")}), 200
 
 
 @app.route("/get_recent_alerts", methods=["GET"])
@@ -348,17 +654,18 @@ def get_recent_alerts():
         conn = get_db_connection()
         c = conn.cursor()
         # Join alerts → sessions → users
-        c.execute(
+        with DB_QUERY_SECONDS.time(query="get_recent_alerts"):
+            c.execute(
+                """
+                SELECT a.alert_type, a.timestamp, u.full_name AS user_name
+                FROM alerts a
+                JOIN sessions s ON a.session_id = s.id
+                JOIN users u ON s.user_id = u.id
+                ORDER BY a.timestamp DESC
+                LIMIT 10;
             """
-            SELECT a.alert_type, a.timestamp, u.full_name AS user_name
-            FROM alerts a
-            JOIN sessions s ON a.session_id = s.id
-            JOIN users u ON s.user_id = u.id
-            ORDER BY a.timestamp DESC
-            LIMIT 10;
-        """
-        )
-        rows = c.fetchall()
+            )
+            rows = c.fetchall()
         conn.close()
 
         alerts = [
@@ -371,7 +678,7 @@ def get_recent_alerts():
         ]
         return jsonify({"alerts": alerts}), 200
     except Exception as e:
-        print("[/get_recent_alerts] Could not fetch alerts:", e)
+        log.warning("could not fetch recent alerts", extra={"error": str(e)})
         return jsonify({"alerts": []}), 200
 
 
@@ -380,7 +687,118 @@ def dashboard_page():
     return render_template("dashboard.html")
 
 
+# ------------------- ALERT HISTORY (database + archive) -------------------
+@app.route("/alerts_history", methods=["GET"])
+def alerts_history():
+    """Stream alerts as NDJSON from the database and archive: ?start=&end=&user_id=&alert_type=."""
+    filters = {k: request.args.get(k) for k in ("start", "end", "user_id", "alert_type")}
+    # Validate before streaming: an error inside the generator would cut a 200 short
+    try:
+        for key in ("start", "end"):
+            if filters[key] is not None:
+                filters[key] = retention.parse_timestamp(filters[key])
+    except ValueError:
+        return (
+            jsonify({"status": "error", "message": "start/end must be ISO dates or datetimes"}),
+            400,
+        )
+
+    def generate():
+        for alert in retention.query_alerts(DB_PATH, **filters):
+            yield json.dumps(alert) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+# ------------------- FRAME TELEMETRY -------------------
+def _read_body(limit):
+    """
+    The request body, or None if it is longer than `limit` bytes. Reads at
+    most limit + 1 bytes, also for chunked bodies without a Content-Length.
+    """
+    if (request.content_length or 0) > limit:
+        return None
+    chunks, size = [], 0
+    while True:
+        chunk = request.stream.read(min(64 * 1024, limit + 1 - size))
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > limit:
+            return None
+
+
+@app.route("/telemetry/upload", methods=["POST"])
+def telemetry_upload():
+    """Bulk-load one sealed telemetry chunk (raw request body): ?device_id=&user_id=."""
+    device_id = request.args.get("device_id")
+    if not device_id:
+        return jsonify({"status": "error", "message": "device_id is required"}), 400
+    data = _read_body(TELEMETRY_MAX_UPLOAD_BYTES)
+    if data is None:
+        return jsonify({"status": "error", "message": "Chunk too large"}), 413
+
+    # Only tag chunks the device attributed itself; the latest registered driver
+    # is not necessarily who was driving when the frames were recorded
+    user_id = request.args.get("user_id") or None
+    conn = get_db_connection()
+    try:
+        with DB_QUERY_SECONDS.time(query="telemetry_ingest"):
+            records = telemetry.ingest_chunk(conn, device_id, data, user_id)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    finally:
+        conn.close()
+
+    TELEMETRY_RECORDS_INGESTED.inc(records)
+    return jsonify({"status": "ok", "records": records}), 200
+
+
+# ------------------- ON-CHAIN VERIFICATION (local index) -------------------
+@app.route("/verify_alert", methods=["GET"])
+def verify_alert():
+    """
+    Is ?tx_hash= an indexed AlertLogger alert (for ?driver_id=, if given)?
+    Answered from the local chain index, not RPC.
+    """
+    tx_hash = request.args.get("tx_hash")
+    if not tx_hash:
+        return jsonify({"error": "Missing tx_hash"}), 400
+    alert, indexed_through = chain_indexer.find_alert(
+        DB_PATH, tx_hash, request.args.get("driver_id")
+    )
+    return (
+        jsonify(
+            {
+                "on_chain": alert is not None,
+                "alert": alert,
+                "indexed_through_block": indexed_through,
+            }
+        ),
+        200,
+    )
+
+
+@app.route("/chain_alerts/<driver_id>", methods=["GET"])
+def chain_alerts(driver_id):
+    """Newest-first indexed on-chain alerts: ?limit=&before=<block>:<log_index> for paging."""
+    try:
+        limit = min(max(int(request.args.get("limit", 100)), 1), 1000)
+        before = request.args.get("before")
+        if before is not None:
+            block, log_index = before.split(":")
+            before = (int(block), int(log_index))
+    except ValueError:
+        return jsonify({"error": "limit must be a number and before <block>:<log_index>"}), 400
+    alerts = chain_indexer.alerts_for_driver(DB_PATH, driver_id, limit, before)
+    next_before = None
+    if len(alerts) == limit:
+        next_before = f"{alerts[-1]['block_number']}:{alerts[-1]['log_index']}"
+    return jsonify({"alerts": alerts, "next_before": next_before}), 200
+
+
 # ------------------- Run Flask -------------------
 if __name__ == "__main__":
-    print("[app] Starting Flask app. DB file:", DB_PATH)
+    log.info("starting Flask app", extra={"db_path": DB_PATH})
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -0,0 +1,127 @@
+# benchmarks/bench_backends.py
+"""
+Compare landmark backends on the same clip: throughput and how closely their
+EAR / MAR / head-tilt readings agree with a reference backend.
+
+    python -m benchmarks.bench_backends --clip drive.mp4
+    python -m benchmarks.bench_backends --clip drive.mp4 --backends mediapipe,lbf
+
+For each backend, per frame: prepare + detect + extract_features time (FPS),
+faces found, and on frames where both it and the reference found a face, the
+mean absolute EAR / MAR / angle difference and how often the EAR < EAR_THRESH
+and MAR > MAR_THRESH decisions match. Backends that cannot be built here
+(missing model or package) are reported with their error.
+
+Run from the repo root so `python -m` can import the `benchmarks` and
+`detection` packages.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.fixtures import make_synthetic_clip, read_clip
+
+DEFAULT_BACKENDS = "mediapipe,mediapipe-lite,lbf"
+
+
+def run_backend(kind, frames):
+    """Per-frame (ear, mar, angle) or None, plus timing, for one backend."""
+    from detection.landmark_backends import create_backend
+    from detection.features import extract_features
+
+    backend = create_backend(kind)
+    readings, samples = [], []
+    try:
+        for frame in frames:
+            h, w, _ = frame.shape
+            t0 = time.perf_counter()
+            faces = backend.detect(backend.prepare(frame), w, h)
+            reading = extract_features(faces[0].points) if faces else None
+            samples.append(time.perf_counter() - t0)
+            readings.append(reading)
+    finally:
+        backend.close()
+
+    total = sum(samples)
+    return readings, {
+        "frames": len(frames),
+        "faces_found": sum(r is not None for r in readings),
+        "fps": len(frames) / total if total else 0.0,
+        "median_ms": statistics.median(samples) * 1000 if samples else 0.0,
+    }
+
+
+def agreement(readings, reference):
+    from detection.features import EAR_THRESH, MAR_THRESH
+
+    pairs = [(r, ref) for r, ref in zip(readings, reference) if r and ref]
+    if not pairs:
+        return {"frames_compared": 0}
+    n = len(pairs)
+    return {
+        "frames_compared": n,
+        "ear_mae": sum(abs(r[0] - ref[0]) for r, ref in pairs) / n,
+        "mar_mae": sum(abs(r[1] - ref[1]) for r, ref in pairs) / n,
+        "angle_mae_deg": sum(abs(r[2] - ref[2]) for r, ref in pairs) / n,
+        "eyes_closed_agree": sum(
+            (r[0] < EAR_THRESH) == (ref[0] < EAR_THRESH) for r, ref in pairs
+        ) / n,
+        "yawn_agree": sum((r[1] > MAR_THRESH) == (ref[1] > MAR_THRESH) for r, ref in pairs) / n,
+    }
+
+
+def run(args):
+    tmpdir = None
+    clip = args.clip
+    if clip is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        clip = make_synthetic_clip(os.path.join(tmpdir.name, "clip.avi"), args.frames)
+    try:
+        frames = read_clip(clip, args.frames)
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    kinds = [k.strip() for k in args.backends.split(",") if k.strip()]
+    reference = args.reference or kinds[0]
+    if reference not in kinds:
+        kinds.insert(0, reference)
+
+    readings, results = {}, {}
+    for kind in kinds:
+        try:
+            readings[kind], results[kind] = run_backend(kind, frames)
+        except Exception as e:
+            results[kind] = {"error": str(e)}
+
+    for kind in kinds:
+        if kind != reference and kind in readings and reference in readings:
+            results[kind]["agreement"] = agreement(readings[kind], readings[reference])
+
+    return {
+        "meta": {"clip": args.clip or "synthetic", "frames": len(frames), "reference": reference},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Landmark backend comparison")
+    parser.add_argument("--clip", default=None, help="video clip (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=150, help="frames to use from the clip")
+    parser.add_argument("--backends", default=DEFAULT_BACKENDS, help="comma-separated backends")
+    parser.add_argument("--reference", default=None, help="backend to compare against (default: first)")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
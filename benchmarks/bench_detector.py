@@ -0,0 +1,257 @@
+# benchmarks/bench_detector.py
+"""
+CPU micro-benchmarks for the drowsiness detector.
+
+    python -m benchmarks.bench_detector                    # run + print
+    python -m benchmarks.bench_detector --save-baseline    # record baseline
+    python -m benchmarks.bench_detector --compare          # fail on regression
+
+Measures, per frame:
+  - features.extract   extract_features() on recorded landmark fixtures
+  - stage.color        BGR -> RGB conversion
+  - stage.mesh         FaceMesh inference
+  - stage.features     landmark conversion + EAR/MAR/tilt
+  - stage.draw         mesh drawing
+  - stage.encode       JPEG encoding
+  - end_to_end         gen_frames() FPS over the whole clip
+  - memory             traced Python/numpy allocation peak per frame
+
+Run from the repo root so `python -m` can import the `benchmarks` and
+`detection` packages.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.fixtures import (
+    SYNTHETIC_LANDMARKS,
+    load_landmarks,
+    make_synthetic_clip,
+    read_clip,
+)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# Metrics where larger is better; everything else is a latency
+HIGHER_IS_BETTER = {"end_to_end": "fps"}
+
+
+# ------------------- Helpers -------------------
+def _summary(samples):
+    """Summarize a list of durations (seconds) in milliseconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p95_ms": p95 * 1000,
+        "min_ms": ordered[0] * 1000,
+    }
+
+
+# ------------------- Benchmarks -------------------
+def bench_features(frames, repeat=5):
+    from detection.features import extract_features
+
+    samples = []
+    for _ in range(repeat):
+        for landmarks in frames:
+            t0 = time.perf_counter()
+            extract_features(landmarks)
+            samples.append(time.perf_counter() - t0)
+    return {"features.extract": _summary(samples)}
+
+
+def bench_stages(frames):
+    import cv2
+    from detection import detect_drowsiness as dd
+
+    backend = dd.landmark_backend
+    stages = {k: [] for k in ("color", "mesh", "features", "draw", "encode")}
+    faces_found = 0
+    for frame in frames:
+        frame = frame.copy()
+        h, w, _ = frame.shape
+
+        t0 = time.perf_counter()
+        image = backend.prepare(frame)
+        t1 = time.perf_counter()
+        faces = backend.detect(image, w, h)
+        t2 = time.perf_counter()
+        stages["color"].append(t1 - t0)
+        stages["mesh"].append(t2 - t1)
+
+        if faces:
+            faces_found += 1
+            t0 = time.perf_counter()
+            dd.extract_features(faces[0].points)
+            t1 = time.perf_counter()
+            backend.draw(frame, faces[0])
+            t2 = time.perf_counter()
+            stages["features"].append(t1 - t0)
+            stages["draw"].append(t2 - t1)
+
+        t0 = time.perf_counter()
+        cv2.imencode(".jpg", frame)
+        stages["encode"].append(time.perf_counter() - t0)
+
+    out = {f"stage.{k}": _summary(v) for k, v in stages.items() if v}
+    out["stage.faces_found"] = {"n": faces_found, "of": len(frames)}
+    return out
+
+
+def bench_memory(frames):
+    """Peak traced allocation for one full frame pass (tracemalloc is slow,
+    so this runs separately from the timing passes)."""
+    import cv2
+    from detection import detect_drowsiness as dd
+
+    backend = dd.landmark_backend
+    peaks = []
+    tracemalloc.start()
+    try:
+        for frame in frames:
+            frame = frame.copy()
+            h, w, _ = frame.shape
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            faces = backend.detect(backend.prepare(frame), w, h)
+            if faces:
+                dd.extract_features(faces[0].points)
+                backend.draw(frame, faces[0])
+            cv2.imencode(".jpg", frame)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - base)
+    finally:
+        tracemalloc.stop()
+    return {
+        "memory": {
+            "n": len(peaks),
+            "mean_kib_per_frame": statistics.fmean(peaks) / 1024,
+            "max_kib_per_frame": max(peaks) / 1024,
+        }
+    }
+
+
+def bench_end_to_end(clip_path):
+    """Drive gen_frames() over a clip with sound and backend calls disabled."""
+    from detection import detect_drowsiness as dd
+
+    saved = dd.play_alert, dd.send_alert_to_backend
+    dd.play_alert = lambda *_: None
+    dd.send_alert_to_backend = lambda *_: None
+    try:
+        n = 0
+        t0 = time.perf_counter()
+        for _ in dd.gen_frames(clip_path):
+            n += 1
+        elapsed = time.perf_counter() - t0
+    finally:
+        dd.play_alert, dd.send_alert_to_backend = saved
+    return {"end_to_end": {"n": n, "fps": n / elapsed if elapsed else 0.0}}
+
+
+# ------------------- Baseline -------------------
+def compare(current, baseline, tolerance):
+    """Return human-readable regressions of `current` against `baseline`."""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        cur = current["results"].get(name)
+        if not cur:
+            continue
+        if name in HIGHER_IS_BETTER:
+            key = HIGHER_IS_BETTER[name]
+            if cur[key] < base[key] * (1 - tolerance):
+                regressions.append(f"{name}: {key} {cur[key]:.1f} < baseline {base[key]:.1f}")
+        elif "median_ms" in base:
+            if cur["median_ms"] > base["median_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: median {cur['median_ms']:.3f}ms > baseline {base['median_ms']:.3f}ms"
+                )
+        elif "mean_kib_per_frame" in base:
+            if cur["mean_kib_per_frame"] > base["mean_kib_per_frame"] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {cur['mean_kib_per_frame']:.0f} KiB/frame > "
+                    f"baseline {base['mean_kib_per_frame']:.0f} KiB/frame"
+                )
+    return regressions
+
+
+def run(args):
+    results = {}
+    results.update(bench_features(load_landmarks(args.fixture), repeat=args.repeat))
+
+    if not args.skip_video:
+        tmpdir = None
+        clip = args.clip
+        if clip is None:
+            tmpdir = tempfile.TemporaryDirectory()
+            clip = make_synthetic_clip(os.path.join(tmpdir.name, "clip.avi"), args.frames)
+        try:
+            frames = read_clip(clip, args.frames)
+            results.update(bench_stages(frames))
+            results.update(bench_memory(frames))
+            results.update(bench_end_to_end(clip))
+        finally:
+            if tmpdir is not None:
+                tmpdir.cleanup()
+
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "clip": args.clip or "synthetic",
+            "fixture": os.path.relpath(args.fixture),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drowsiness detector benchmarks")
+    parser.add_argument("--fixture", default=SYNTHETIC_LANDMARKS, help="landmark fixture JSON")
+    parser.add_argument("--clip", default=None, help="video clip (default: synthetic)")
+    parser.add_argument("--frames", type=int, default=150, help="frames to use from the clip")
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the landmark fixture")
+    parser.add_argument("--skip-video", action="store_true", help="only run fixture benchmarks")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true", help="exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] Baseline saved to {args.baseline}")
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            raise SystemExit(f"[bench] No baseline at {args.baseline}; run with --save-baseline")
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("[bench] ❌ Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("[bench] ✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# benchmarks/fixtures.py
+"""
+Recorded-landmark fixtures and synthetic clips for the detector benchmarks.
+
+A landmark fixture is a JSON file holding only the landmarks the detector
+reads (landmark_backends.FEATURE_IDX), one frame per line:
+
+    {"indices": [...], "frame_size": [w, h], "fps": 30,
+     "frames": [[[x, y], ...], ...]}
+
+Fixtures are either recorded from a real clip (record_landmarks.py) or
+generated by make_synthetic_landmarks(), which scripts a drive with a
+blink, a long eye closure, two yawns and a sustained head tilt.
+
+Chain fixtures hold AlertLogger activity as a node returns it (hex strings
+as in the JSON-RPC responses), for driving chain_indexer without a node:
+
+    {"contract_address": ..., "head": n,
+     "blocks": [{"number", "timestamp", "transactions": [{"hash", "to",
+                 "input", "transactionIndex"}]}],
+     "receipts": {tx_hash: {"status": 0|1}},
+     "logs": [eth_getLogs entries for the contract]}
+
+They are recorded from a Hardhat node (record_chain.py) or generated by
+make_synthetic_chain().
+"""
+import json
+import math
+import os
+import random
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SYNTHETIC_LANDMARKS = os.path.join(FIXTURES_DIR, "synthetic_landmarks.json")
+SYNTHETIC_CHAIN = os.path.join(FIXTURES_DIR, "synthetic_chain.json")
+CONTRACT_INFO_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "contract-info.json"
+)
+
+FRAME_SIZE = (640, 480)
+FPS = 30
+
+# (start_frame, end_frame, ear, mar, tilt_deg) – frames outside use defaults
+_SCRIPT = [
+    (40, 44, 0.10, 0.30, 0.0),     # blink
+    (90, 170, 0.12, 0.30, 0.0),    # eyes closed > EYE_CONSEC_FRAMES
+    (210, 235, 0.30, 0.90, 0.0),   # yawn 1
+    (250, 275, 0.30, 0.90, 0.0),   # yawn 2
+    (300, 360, 0.30, 0.30, 35.0),  # head tilt
+]
+_DEFAULT = (0.30, 0.30, 0.0)
+SYNTHETIC_FRAMES = 360
+
+
+# ------------------- Landmark Fixtures -------------------
+def _face_points(ear, mar, tilt_deg, center, rng):
+    """Place every feature landmark for one synthetic face."""
+    from detection.landmark_backends import (
+        LEFT_EYE_IDX,
+        RIGHT_EYE_IDX,
+        MOUTH_IDX,
+        HEAD_TILT_IDX,
+    )
+
+    eye_w, mouth_w = 30.0, 60.0
+    eye_h = ear * eye_w
+    mouth_h = mar * mouth_w
+    pts = {}
+
+    def eye(idx, ox, oy):
+        # p0 / p3 are the corners, p1 p2 upper lid, p4 p5 lower lid
+        x0 = ox - eye_w / 2
+        layout = [
+            (x0, oy),
+            (x0 + eye_w / 3, oy - eye_h / 2),
+            (x0 + 2 * eye_w / 3, oy - eye_h / 2),
+            (x0 + eye_w, oy),
+            (x0 + 2 * eye_w / 3, oy + eye_h / 2),
+            (x0 + eye_w / 3, oy + eye_h / 2),
+        ]
+        pts.update(zip(idx, layout))
+
+    eye(LEFT_EYE_IDX, -45.0, -30.0)
+    eye(RIGHT_EYE_IDX, 45.0, -30.0)
+
+    # compute_MAR reads positions 0/6 (corners), 2/10 and 4/8 (vertical pairs)
+    mx0, my = -mouth_w / 2, 60.0
+    mouth = [(mx0 + mouth_w * k / 10, my) for k in range(11)]
+    mouth[0] = (mx0, my)
+    mouth[6] = (mx0 + mouth_w, my)
+    mouth[2] = (mx0 + mouth_w / 3, my - mouth_h / 2)
+    mouth[10] = (mx0 + mouth_w / 3, my + mouth_h / 2)
+    mouth[4] = (mx0 + 2 * mouth_w / 3, my - mouth_h / 2)
+    mouth[8] = (mx0 + 2 * mouth_w / 3, my + mouth_h / 2)
+    pts.update(zip(MOUTH_IDX, mouth))
+
+    pts[HEAD_TILT_IDX[0]] = (-90.0, 0.0)
+    pts[HEAD_TILT_IDX[1]] = (90.0, 0.0)
+
+    theta = math.radians(tilt_deg)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    cx, cy = center
+    out = {}
+    for i, (x, y) in pts.items():
+        rx = x * cos_t - y * sin_t + cx + rng.uniform(-0.4, 0.4)
+        ry = x * sin_t + y * cos_t + cy + rng.uniform(-0.4, 0.4)
+        out[i] = (int(rx), int(ry))
+    return out
+
+
+def make_synthetic_landmarks(n_frames=SYNTHETIC_FRAMES, seed=0):
+    """Return a list of {landmark_index: (x, y)} dicts for a scripted drive."""
+    rng = random.Random(seed)
+    center = (FRAME_SIZE[0] // 2, FRAME_SIZE[1] // 2)
+    frames = []
+    for n in range(n_frames):
+        ear, mar, tilt = _DEFAULT
+        for start, end, s_ear, s_mar, s_tilt in _SCRIPT:
+            if start <= n < end:
+                ear, mar, tilt = s_ear, s_mar, s_tilt
+                break
+        frames.append(_face_points(ear, mar, tilt, center, rng))
+    return frames
+
+
+def save_landmarks(path, frames, frame_size=FRAME_SIZE, fps=FPS):
+    """Write landmark frames in the fixture format (one frame per line)."""
+    indices = sorted(frames[0]) if frames else []
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        header = {"indices": indices, "frame_size": list(frame_size), "fps": fps}
+        f.write(json.dumps(header)[:-1] + ', "frames": [\n')
+        for n, frame in enumerate(frames):
+            row = [list(frame[i]) for i in indices]
+            sep = ",\n" if n < len(frames) - 1 else "\n"
+            f.write(json.dumps(row, separators=(",", ":")) + sep)
+        f.write("]}\n")
+
+
+def load_landmarks(path=SYNTHETIC_LANDMARKS):
+    """Load a fixture as a list of {landmark_index: (x, y)} dicts."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    indices = data["indices"]
+    return [
+        {i: (p[0], p[1]) for i, p in zip(indices, row)} for row in data["frames"]
+    ]
+
+
+# ------------------- Synthetic Video Clips -------------------
+def make_synthetic_clip(path, n_frames=150, frame_size=FRAME_SIZE, fps=FPS, seed=0):
+    """
+    Render a simple moving face-like clip (MJPG .avi) for CPU timing runs.
+    FaceMesh may or may not lock onto it; use a recorded clip (--clip) when
+    the mesh/draw stages need to be exercised on every frame.
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    w, h = frame_size
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (w, h))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open video writer for {path}")
+    try:
+        for n in range(n_frames):
+            frame = rng.integers(40, 70, size=(h, w, 3), dtype=np.uint8)
+            cx = w // 2 + int(20 * math.sin(n / 15.0))
+            cy = h // 2
+            cv2.ellipse(frame, (cx, cy), (110, 140), 0, 0, 360, (150, 180, 220), -1)
+            eye_h = 2 if 40 <= n % 90 < 44 else 8
+            for ex in (cx - 45, cx + 45):
+                cv2.ellipse(frame, (ex, cy - 30), (16, eye_h), 0, 0, 360, (40, 40, 40), -1)
+            mouth_h = 25 if 60 <= n % 120 < 85 else 6
+            cv2.ellipse(frame, (cx, cy + 60), (30, mouth_h), 0, 0, 360, (40, 40, 120), -1)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return path
+
+
+def read_clip(path, max_frames=None):
+    """Decode a clip into a list of BGR frames (kept in memory for timing)."""
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open clip {path}")
+    frames = []
+    try:
+        while max_frames is None or len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+    finally:
+        cap.release()
+    return frames
+
+
+# ------------------- Chain Fixtures -------------------
+# (block, tx kind, driverId, alertType, alertCount, driverName): one block per
+# transaction like Hardhat's automine, plus a failed call and an unrelated tx
+_CHAIN_SCRIPT = [
+    (1, "deploy", None, None, None, None),
+    (2, "alert", "driver-1", "yawn", 5, "Asha"),
+    (3, "alert", "driver-2", "sleep", 5, "Ben"),
+    (4, "failed", "driver-2", "sleep", 5, "Ben"),
+    (5, "other", None, None, None, None),
+    (6, "alert", "driver-1", "head_tilt", 5, "Asha"),
+    (7, "alert", "driver-1", "sleep", 5, "Asha"),
+]
+_OTHER_ADDRESS = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+
+def make_synthetic_chain(contract_info_path=CONTRACT_INFO_PATH, start_time=1700000000):
+    """ABI-encode the scripted AlertLogger activity in the chain fixture format."""
+    from eth_abi import encode
+    from web3 import Web3
+
+    with open(contract_info_path, "r") as f:
+        info = json.load(f)
+    address = info["contract_address"]
+    contract = Web3().eth.contract(address=address, abi=info["abi"])
+    event = next(e for e in info["abi"] if e.get("name") == "AlertLogged")
+    types = [i["type"] for i in event["inputs"]]
+    topic = Web3.to_hex(Web3.keccak(text="AlertLogged(%s)" % ",".join(types)))
+
+    blocks = [{"number": 0, "timestamp": start_time, "transactions": []}]
+    receipts, logs = {}, []
+    for number, kind, driver_id, alert_type, count, name in _CHAIN_SCRIPT:
+        timestamp = start_time + number * 12
+        tx_hash = Web3.to_hex(Web3.keccak(text=f"tx-{number}"))
+        if kind == "deploy":
+            to, data = None, "0x6080"
+        elif kind == "other":
+            to, data = _OTHER_ADDRESS, "0x"
+        else:
+            to = address
+            data = contract.encode_abi("logAlert", args=[driver_id, alert_type, count, name])
+        blocks.append(
+            {
+                "number": number,
+                "timestamp": timestamp,
+                "transactions": [
+                    {"hash": tx_hash, "to": to, "input": data, "transactionIndex": 0}
+                ],
+            }
+        )
+        receipts[tx_hash] = {"status": 0 if kind == "failed" else 1}
+        if kind == "alert":
+            logs.append(
+                {
+                    "address": address,
+                    "topics": [topic],
+                    "data": Web3.to_hex(
+                        encode(types, [driver_id, alert_type, count, name, timestamp])
+                    ),
+                    "blockNumber": number,
+                    "blockHash": Web3.to_hex(Web3.keccak(text=f"block-{number}")),
+                    "transactionHash": tx_hash,
+                    "transactionIndex": 0,
+                    "logIndex": 0,
+                    "removed": False,
+                }
+            )
+    return {
+        "contract_address": address,
+        "head": blocks[-1]["number"],
+        "blocks": blocks,
+        "receipts": receipts,
+        "logs": logs,
+    }
+
+
+def save_chain(path, chain):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(chain, f, indent=1)
+        f.write("\n")
+
+
+def load_chain(path=SYNTHETIC_CHAIN):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    save_landmarks(SYNTHETIC_LANDMARKS, make_synthetic_landmarks())
+    print("[fixtures] Wrote", SYNTHETIC_LANDMARKS)
+    save_chain(SYNTHETIC_CHAIN, make_synthetic_chain())
+    print("[fixtures] Wrote", SYNTHETIC_CHAIN)
@@ -0,0 +1,269 @@
+# benchmarks/load_test.py
+"""
+Load test for the Flask backend (app.py).
+
+    python -m benchmarks.load_test --duration 30 --concurrency 16 \\
+        --drivers 200 --mix alert=90,register=2,dashboard=8 \\
+        --out loadtest_report.json
+
+By default the app is started in-process on a scratch database with every
+outside dependency replaced by a local stand-in (see standins.py):
+Web3 JSON-RPC, the company servers on 5001/7000 and SMTP. Pass --target
+to drive an already running backend (e.g. under gunicorn) instead; the
+stand-ins are still started so the backend should be launched with the
+same WEB3_RPC_URL / SMTP_* environment printed at startup.
+
+Run from the repo root.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.standins import start_standins
+
+ALERT_TYPES = ("yawn", "sleep", "head_tilt")
+DASHBOARD_PATHS = ("/get_alert_counts", "/get_total_notifications", "/get_recent_alerts")
+
+
+# ------------------- Setup -------------------
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("alert", "register", "dashboard"):
+            raise SystemExit(f"[load_test] Unknown traffic type in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def configure_env(args, db_path):
+    env = {
+        "DB_PATH": db_path,
+        "WEB3_RPC_URL": f"http://127.0.0.1:{args.rpc_port}",
+        "EMAIL_USER": "loadtest@example.com",
+        "EMAIL_PASS": "loadtest",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(args.smtp_port),
+        "SMTP_STARTTLS": "0",
+    }
+    os.environ.update(env)
+    return env
+
+
+def start_app(port):
+    """Import app.py (after the environment is set) and serve it threaded."""
+    from werkzeug.serving import make_server
+    import app as backend
+
+    server = make_server("127.0.0.1", port, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _driver_payload(n):
+    return {
+        "user_info": {
+            "full_name": f"Load Driver {n}",
+            "age": 30 + n % 30,
+            "email": f"driver{n}@example.com",
+            "phone": f"+1555{n:07d}",
+        },
+        "contacts": [
+            {
+                "name": f"Contact {n}",
+                "relation": "Family",
+                "email": f"contact{n}@example.com",
+                "phone": f"+1666{n:07d}",
+            }
+        ],
+    }
+
+
+def register_drivers(base_url, n):
+    ids = []
+    with requests.Session() as s:
+        for i in range(n):
+            res = s.post(f"{base_url}/add_user", json=_driver_payload(i), timeout=10)
+            res.raise_for_status()
+            ids.append(res.json()["user_id"])
+    return ids
+
+
+# ------------------- Traffic -------------------
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}  # op -> [(latency_s, status)]
+
+    def add(self, op, latency, status):
+        with self._lock:
+            self.samples.setdefault(op, []).append((latency, status))
+
+
+def worker(base_url, driver_ids, mix, deadline, recorder, seed):
+    rng = random.Random(seed)
+    ops, weights = list(mix), list(mix.values())
+    counter = 0
+    with requests.Session() as s:
+        while time.perf_counter() < deadline:
+            op = rng.choices(ops, weights)[0]
+            if op == "alert":
+                req = dict(
+                    method="POST",
+                    url=f"{base_url}/log_alert",
+                    json={
+                        "user_id": rng.choice(driver_ids),
+                        "alert_type": rng.choice(ALERT_TYPES),
+                    },
+                )
+            elif op == "register":
+                counter += 1
+                req = dict(
+                    method="POST",
+                    url=f"{base_url}/add_user",
+                    json=_driver_payload(seed * 1_000_000 + counter),
+                )
+            else:
+                req = dict(method="GET", url=base_url + rng.choice(DASHBOARD_PATHS))
+
+            t0 = time.perf_counter()
+            try:
+                status = s.request(timeout=30, **req).status_code
+            except requests.RequestException:
+                status = 0
+            recorder.add(op, time.perf_counter() - t0, status)
+
+
+# ------------------- Report -------------------
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarize(recorder, elapsed):
+    ops = {}
+    total = errors = shed = 0
+    for op, samples in recorder.samples.items():
+        lat = sorted(l for l, _ in samples)
+        statuses = {}
+        for _, st in samples:
+            statuses[str(st)] = statuses.get(str(st), 0) + 1
+        # 429 is admission control shedding load on purpose, not a failure
+        op_shed = statuses.get("429", 0)
+        op_errors = sum(1 for _, st in samples if st == 0 or st >= 400) - op_shed
+        total += len(samples)
+        errors += op_errors
+        shed += op_shed
+        ops[op] = {
+            "requests": len(samples),
+            "throughput_rps": len(samples) / elapsed,
+            "errors": op_errors,
+            "error_rate": op_errors / len(samples),
+            "shed": op_shed,
+            "status_codes": statuses,
+            "latency_ms": {
+                "mean": statistics.fmean(lat) * 1000,
+                "p50": _percentile(lat, 0.50) * 1000,
+                "p90": _percentile(lat, 0.90) * 1000,
+                "p95": _percentile(lat, 0.95) * 1000,
+                "p99": _percentile(lat, 0.99) * 1000,
+                "max": lat[-1] * 1000,
+            },
+        }
+    return {
+        "requests": total,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "shed": shed,
+        "by_type": ops,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend load test")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--drivers", type=int, default=100, help="simulated drivers")
+    parser.add_argument("--mix", default="alert=90,register=2,dashboard=8")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=5050, help="port for the in-process app")
+    parser.add_argument("--target", default=None, help="base URL of an already running backend")
+    parser.add_argument("--rpc-port", type=int, default=8546)
+    parser.add_argument("--smtp-port", type=int, default=2525)
+    parser.add_argument("--out", default="loadtest_report.json")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    tmpdir = tempfile.TemporaryDirectory()
+    env = configure_env(args, os.path.join(tmpdir.name, "loadtest.db"))
+    standins = start_standins(rpc_port=args.rpc_port, smtp_port=args.smtp_port)
+
+    server = None
+    if args.target:
+        base_url = args.target.rstrip("/")
+        print("[load_test] Driving", base_url, "- backend env should include:")
+        for k, v in env.items():
+            if k != "DB_PATH":
+                print(f"    {k}={v}")
+    else:
+        server = start_app(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        print(f"[load_test] Registering {args.drivers} drivers ...")
+        driver_ids = register_drivers(base_url, args.drivers)
+
+        recorder = Recorder()
+        t0 = time.perf_counter()
+        deadline = t0 + args.duration
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(base_url, driver_ids, mix, deadline, recorder, args.seed + i + 1),
+            )
+            for i in range(args.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - t0
+
+        report = {
+            "config": {
+                "target": base_url,
+                "duration_s": args.duration,
+                "concurrency": args.concurrency,
+                "drivers": args.drivers,
+                "mix": mix,
+                "seed": args.seed,
+            },
+            "elapsed_s": elapsed,
+            "results": summarize(recorder, elapsed),
+            "standins": {name: s.counts for name, s in standins.items()},
+        }
+    finally:
+        if server is not None:
+            server.shutdown()
+        for s in standins.values():
+            s.stop()
+        tmpdir.cleanup()
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    res = report["results"]
+    print(
+        f"[load_test] {res['requests']} requests, {res['throughput_rps']:.1f} req/s, "
+        f"error rate {res['error_rate']:.2%}, shed {res['shed']} -> {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
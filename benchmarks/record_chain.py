@@ -0,0 +1,73 @@
+# benchmarks/record_chain.py
+"""
+Record AlertLogger activity from a running node (e.g. Hardhat) into a chain
+fixture for the chain_indexer tests.
+
+    python -m benchmarks.record_chain benchmarks/fixtures/hardhat_chain.json
+
+Uses the RPC URL and contract from contract-info.json (WEB3_RPC_URL
+overrides the URL), like blockchain_client.
+"""
+import argparse
+import json
+
+from benchmarks.fixtures import save_chain
+
+
+def _plain(value):
+    """AttributeDict / HexBytes -> JSON-compatible values, as the RPC returns them."""
+    from web3 import Web3
+
+    return json.loads(Web3.to_json(value))
+
+
+def record(web3, contract, from_block=0, to_block=None):
+    head = web3.eth.block_number if to_block is None else to_block
+    address = contract.address.lower()
+    blocks, receipts = [], {}
+    for number in range(from_block, head + 1):
+        block = web3.eth.get_block(number, full_transactions=True)
+        txs = []
+        for tx in block["transactions"]:
+            tx_hash = web3.to_hex(tx["hash"])
+            txs.append(
+                {
+                    "hash": tx_hash,
+                    "to": tx.get("to"),
+                    "input": web3.to_hex(tx["input"]),
+                    "transactionIndex": tx["transactionIndex"],
+                }
+            )
+            if (tx.get("to") or "").lower() == address:
+                receipts[tx_hash] = {"status": web3.eth.get_transaction_receipt(tx["hash"])["status"]}
+        blocks.append({"number": number, "timestamp": block["timestamp"], "transactions": txs})
+
+    logs = web3.eth.get_logs(
+        {"address": contract.address, "fromBlock": from_block, "toBlock": head}
+    )
+    return {
+        "contract_address": contract.address,
+        "head": head,
+        "blocks": blocks,
+        "receipts": receipts,
+        "logs": [_plain(entry) for entry in logs],
+    }
+
+
+def main():
+    from blockchain_client import get_client
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--from-block", type=int, default=0)
+    parser.add_argument("--to-block", type=int, default=None)
+    args = parser.parse_args()
+
+    client = get_client()
+    chain = record(client.web3, client.contract, args.from_block, args.to_block)
+    save_chain(args.output, chain)
+    print(f"[record_chain] Saved blocks {args.from_block}..{chain['head']} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
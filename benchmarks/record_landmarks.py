@@ -0,0 +1,56 @@
+# benchmarks/record_landmarks.py
+"""
+Record the detector's feature landmarks from a video clip into a fixture.
+
+    python -m benchmarks.record_landmarks drive.mp4 benchmarks/fixtures/drive.json
+
+Frames where no face is found are skipped.
+"""
+import argparse
+
+import cv2
+
+from benchmarks.fixtures import save_landmarks
+from detection.landmark_backends import create_backend
+
+
+def record(clip_path, max_frames=None, backend="mediapipe"):
+    backend = create_backend(backend)
+    cap = cv2.VideoCapture(clip_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open clip {clip_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    frames, size = [], None
+    try:
+        while max_frames is None or len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            h, w, _ = frame.shape
+            size = (w, h)
+            faces = backend.detect(backend.prepare(frame), w, h)
+            if faces:
+                frames.append(faces[0].points)
+    finally:
+        cap.release()
+        backend.close()
+    return frames, size, int(round(fps))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("clip")
+    parser.add_argument("output")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--backend", default="mediapipe", help="landmark backend to record with")
+    args = parser.parse_args()
+
+    frames, size, fps = record(args.clip, args.max_frames, args.backend)
+    if not frames:
+        raise SystemExit("[record_landmarks] No faces found in clip.")
+    save_landmarks(args.output, frames, frame_size=size, fps=fps)
+    print(f"[record_landmarks] Saved {len(frames)} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# benchmarks/standins.py
+"""
+Local stand-ins for the services app.py talks to on threshold crossings:
+
+  - FakeRPCServer      minimal Ethereum JSON-RPC (enough for blockchain_client)
+  - FakeCompanyServer  company endpoints on 5001 (/receive-alert) and
+                       7000 (/company_receive)
+  - FakeSMTPServer     accepts AUTH PLAIN + one message per session
+
+Each stand-in runs on a daemon thread and counts what it received so the
+load test can report it next to the backend numbers.
+"""
+import base64
+import hashlib
+import json
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Standin:
+    """Common start/stop + counters for the threaded servers below."""
+
+    def __init__(self, server):
+        self.server = server
+        self.server.standin = self
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _send_json(self, obj, status=200):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# ------------------- JSON-RPC (Web3) -------------------
+class _RPCHandler(_QuietHandler):
+    CHAIN_ID = 31337
+    GAS_PRICE = 10**9
+
+    def do_POST(self):
+        standin = self.server.standin
+        req = self._read_json()
+        batch = isinstance(req, list)
+        replies = [self._handle(standin, r) for r in (req if batch else [req])]
+        self._send_json(replies if batch else replies[0])
+
+    def _handle(self, standin, req):
+        method, params = req.get("method"), req.get("params") or []
+        standin.count(method)
+        reply = {"jsonrpc": "2.0", "id": req.get("id")}
+        if method == "eth_chainId":
+            reply["result"] = hex(self.CHAIN_ID)
+        elif method == "net_version":
+            reply["result"] = str(self.CHAIN_ID)
+        elif method == "eth_gasPrice":
+            reply["result"] = hex(self.GAS_PRICE)
+        elif method == "eth_blockNumber":
+            reply["result"] = hex(standin.counts.get("eth_sendRawTransaction", 0))
+        elif method == "eth_getTransactionCount":
+            reply["result"] = hex(standin.counts.get("eth_sendRawTransaction", 0))
+        elif method == "eth_estimateGas":
+            reply["result"] = hex(500000)
+        elif method == "eth_sendRawTransaction":
+            raw = params[0] if params else ""
+            reply["result"] = "0x" + hashlib.sha256(raw.encode()).hexdigest()
+        else:
+            reply["error"] = {"code": -32601, "message": f"{method} not supported by stand-in"}
+        return reply
+
+
+class FakeRPCServer(_Standin):
+    def __init__(self, port=8546, host="127.0.0.1"):
+        super().__init__(ThreadingHTTPServer((host, port), _RPCHandler))
+        self.url = f"http://{host}:{port}"
+
+
+# ------------------- Company endpoints -------------------
+class _CompanyHandler(_QuietHandler):
+    def do_POST(self):
+        payload = self._read_json()
+        self.server.standin.count(self.path, len(payload) if isinstance(payload, list) else 1)
+        self._send_json({"status": "success", "message": "alert received"})
+
+
+class FakeCompanyServer(_Standin):
+    def __init__(self, port, host="127.0.0.1"):
+        super().__init__(ThreadingHTTPServer((host, port), _CompanyHandler))
+
+
+# ------------------- SMTP -------------------
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        standin = self.server.standin
+        self._reply("220 fake-smtp ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode(errors="replace").strip().upper()
+            if cmd.startswith(("EHLO", "HELO")):
+                self.wfile.write(b"250-fake-smtp\r\n250-AUTH PLAIN\r\n250 8BITMIME\r\n")
+            elif cmd.startswith("AUTH PLAIN"):
+                parts = cmd.split()
+                if len(parts) == 2:
+                    self._reply("334 ")
+                    base64.b64decode(self.rfile.readline().strip() or b"")
+                self._reply("235 2.7.0 Authentication successful")
+            elif cmd.startswith("DATA"):
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+                standin.count("messages")
+                self._reply("250 2.0.0 Ok: queued")
+            elif cmd.startswith("QUIT"):
+                self._reply("221 2.0.0 Bye")
+                return
+            else:  # MAIL, RCPT, RSET, NOOP ...
+                self._reply("250 2.0.0 Ok")
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeSMTPServer(_Standin):
+    def __init__(self, port=2525, host="127.0.0.1"):
+        super().__init__(_ThreadingTCPServer((host, port), _SMTPHandler))
+
+
+def start_standins(rpc_port=8546, smtp_port=2525, company_ports=(5001, 7000)):
+    """Start every stand-in; returns {name: standin}."""
+    standins = {
+        "rpc": FakeRPCServer(rpc_port),
+        "smtp": FakeSMTPServer(smtp_port),
+    }
+    for port in company_ports:
+        standins[f"company_{port}"] = FakeCompanyServer(port)
+    for s in standins.values():
+        s.start()
+    return standins
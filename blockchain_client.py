@@ -1,58 +1,76 @@
-from web3 import Web3
 import json
 import os
-import requests  # For sending alert to company
+import threading
+import time
+
+from log_utils import get_logger
+from metrics import BLOCKCHAIN_TX_FAILURES, BLOCKCHAIN_TX_SECONDS
+
+log = get_logger("blockchain_client")
 
-# Load contract-info.json
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-with open(os.path.join(BASE_DIR, "contract-info.json"), "r") as f:
-    data = json.load(f)
+CONTRACT_INFO_PATH = os.path.join(BASE_DIR, "contract-info.json")
 
-RPC_URL = data["rpc_url"]
-CONTRACT_ADDRESS = data["contract_address"]
-ABI = data["abi"]
-PRIVATE_KEY = data["private_key"]
-ACCOUNT_ADDRESS = data["account_address"]
+# Web3 (and contract-info.json) are loaded on first use so importing this
+# module stays cheap for processes that never log to the chain.
+_client = None
+_client_lock = threading.Lock()
 
-# Connect Web3
-web3 = Web3(Web3.HTTPProvider(RPC_URL))
 
-# Contract instance
-contract = web3.eth.contract(address=CONTRACT_ADDRESS, abi=ABI)
+class _ChainClient:
+    def __init__(self):
+        from web3 import Web3
 
+        # Load contract-info.json
+        with open(CONTRACT_INFO_PATH, "r") as f:
+            data = json.load(f)
 
-def send_to_company(driver_id, driver_name, alert_type, alert_count, tx_hash):
-    """
-    Sends the alert info to the company API.
-    """
-    try:
-        url = "http://127.0.0.1:5001/receive-alert"  # mock company API
-        payload = {
-            "driver_id": driver_id,
-            "driver_name": driver_name,
-            "alert_type": alert_type,
-            "alert_count": alert_count,
-            "tx_hash": tx_hash,
-        }
-        res = requests.post(url, json=payload)
-        return f"Company server response: {res.json()}"
-    except Exception as e:
-        return f"Company server error: {str(e)}"
+        self.rpc_url = os.getenv("WEB3_RPC_URL", data["rpc_url"])
+        self.private_key = data["private_key"]
+        self.account_address = data["account_address"]
+
+        # Connect Web3
+        self.web3 = Web3(Web3.HTTPProvider(self.rpc_url))
+
+        # Contract instance
+        self.contract = self.web3.eth.contract(
+            address=data["contract_address"], abi=data["abi"]
+        )
+
+
+def get_client():
+    """Return the shared Web3 client, creating it on first call."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _ChainClient()
+                log.info("web3 client initialized", extra={"rpc_url": _client.rpc_url})
+    return _client
+
+
+def is_initialized():
+    return _client is not None
 
 
 def log_alert(driver_id, alert_type, alert_count, driver_name):
     """
-    Sends an alert summary to the blockchain and then notifies the company.
+    Sends an alert summary to the blockchain.
+    Returns {"status": "logged", "transaction_hash": ...} or
+    {"status": "error", "error": ...}; company delivery is done by webhooks.py.
     """
+    t0 = time.perf_counter()
     try:
-        nonce = web3.eth.get_transaction_count(ACCOUNT_ADDRESS)
+        client = get_client()
+        web3, contract = client.web3, client.contract
+        nonce = web3.eth.get_transaction_count(client.account_address)
 
         # Build transaction with extra params: alert_count and driver_name
         tx = contract.functions.logAlert(
             driver_id, alert_type, alert_count, driver_name
         ).build_transaction(
             {
-                "from": ACCOUNT_ADDRESS,
+                "from": client.account_address,
                 "gas": 500000,  # Increased gas, adjust as needed
                 "nonce": nonce,
                 "maxFeePerGas": web3.eth.gas_price,
@@ -60,21 +78,18 @@ def log_alert(driver_id, alert_type, alert_count, driver_name):
             }
         )
 
-        signed_tx = web3.eth.account.sign_transaction(tx, PRIVATE_KEY)
+        signed_tx = web3.eth.account.sign_transaction(tx, client.private_key)
 
         # Web3.py v6 uses raw_transaction
         tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
         tx_hex = web3.to_hex(tx_hash)
-        print(f"Alert logged. Tx Hash: {tx_hex}")
-
-        # Send alert to company API
-        company_response = send_to_company(
-            driver_id, driver_name, alert_type, alert_count, tx_hex
-        )
-        print(company_response)
+        BLOCKCHAIN_TX_SECONDS.observe(time.perf_counter() - t0)
+        log.info("alert logged on chain", extra={"tx_hash": tx_hex, "driver_id": driver_id})
 
-        return f"Alert logged and company notified. Tx Hash: {tx_hex}"
+        return {"status": "logged", "transaction_hash": tx_hex}
 
     except Exception as e:
-        return f"Error logging alert: {str(e)}"
+        BLOCKCHAIN_TX_FAILURES.inc()
+        log.error("blockchain logging failed", extra={"error": str(e)})
+        return {"status": "error", "error": str(e)}
@@ -0,0 +1,79 @@
+# cache.py
+"""
+Bounded LRU caches with TTL for hot read paths (driver profiles, active
+sessions). Only hits are cached, so unknown drivers are re-checked every
+time and become visible as soon as they are registered.
+
+Nothing invalidates entries: the app never updates or deletes users or
+contacts and never ends a session, so a cached value cannot go stale. If
+such a path is added it must call TTLCache.invalidate(), and note that the
+caches are per process, so other workers keep their copy for up to
+CACHE_TTL_SECONDS.
+
+Sizes/TTL: CACHE_MAX_ENTRIES (default 10000), CACHE_TTL_SECONDS (default 300).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import CACHE_REQUESTS
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+
+
+class TTLCache:
+    def __init__(self, name, maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value or None (missing / expired)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                    return entry[1]
+                del self._data[key]
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Read-through: call loader(key) on a miss and cache non-None results."""
+        value = self.get(key)
+        if value is None:
+            value = loader(key)
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# user_id -> (driver_name, [{"name", "email"}, ...])
+user_profiles = TTLCache("user_profiles")
+# user_id -> active session id
+active_sessions = TTLCache("active_sessions")
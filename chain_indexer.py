@@ -0,0 +1,305 @@
+# chain_indexer.py
+"""
+Local index of AlertLogger activity for fast verification queries.
+
+The indexer follows the chain from a checkpointed block and stores every
+logged alert in the `chain_alerts` table (keyed by tx hash + log index,
+indexed by driver), so audit queries such as "is tx X on-chain for driver Y"
+are answered from SQLite instead of calling getAlerts() over RPC.
+
+Two sources, picked with mode=:
+  - "events" (default): eth_getLogs for AlertLogged in block-range chunks
+  - "transactions": scan blocks for successful logAlert() calls, for
+    deployments of the contract that do not emit the event
+
+Only blocks at least `confirmations` deep are indexed, so shallow reorgs
+never reach the table (0 suits a local Hardhat node, which only mines a
+block per transaction).
+
+    python chain_indexer.py --follow            # keep indexing
+    python chain_indexer.py --once              # catch up and exit
+"""
+import argparse
+import sqlite3
+import threading
+
+from log_utils import get_logger
+from metrics import CHAIN_ALERTS_INDEXED, CHAIN_INDEXED_BLOCK, DB_QUERY_SECONDS
+
+log = get_logger("chain_indexer")
+
+CHECKPOINT_KEY = "last_indexed_block"
+
+
+def ensure_tables(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS chain_alerts (
+            tx_hash TEXT NOT NULL,
+            log_index INTEGER NOT NULL,
+            driver_id TEXT NOT NULL,
+            alert_type TEXT,
+            alert_count INTEGER,
+            driver_name TEXT,
+            block_number INTEGER NOT NULL,
+            block_timestamp INTEGER,
+            PRIMARY KEY (tx_hash, log_index)
+        );
+        CREATE INDEX IF NOT EXISTS idx_chain_alerts_driver
+            ON chain_alerts(driver_id, block_number);
+        CREATE TABLE IF NOT EXISTS chain_indexer_state (
+            key TEXT PRIMARY KEY,
+            value INTEGER
+        );
+        """
+    )
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout = 10000;")
+    return conn
+
+
+# ------------------- Queries (no RPC) -------------------
+def get_checkpoint(conn):
+    row = conn.execute(
+        "SELECT value FROM chain_indexer_state WHERE key = ?", (CHECKPOINT_KEY,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def find_alert(db_path, tx_hash, driver_id=None):
+    """
+    Look up an indexed alert by transaction hash (optionally requiring the
+    driver to match). Returns (alert dict or None, indexed-through block).
+    """
+    conn = _connect(db_path)
+    try:
+        with DB_QUERY_SECONDS.time(query="chain_find_alert"):
+            sql = "SELECT * FROM chain_alerts WHERE tx_hash = ?"
+            params = [tx_hash.lower()]
+            if driver_id is not None:
+                sql += " AND driver_id = ?"
+                params.append(driver_id)
+            row = conn.execute(sql + " LIMIT 1", params).fetchone()
+            return (dict(row) if row else None), get_checkpoint(conn)
+    finally:
+        conn.close()
+
+
+def alerts_for_driver(db_path, driver_id, limit=100, before=None):
+    """
+    Newest-first page of indexed alerts for one driver. `before` is the
+    (block_number, log_index) of the last alert on the previous page.
+    """
+    conn = _connect(db_path)
+    try:
+        with DB_QUERY_SECONDS.time(query="chain_alerts_for_driver"):
+            sql = "SELECT * FROM chain_alerts WHERE driver_id = ?"
+            params = [driver_id]
+            if before is not None:
+                sql += " AND (block_number, log_index) < (?, ?)"
+                params.extend(before)
+            sql += " ORDER BY block_number DESC, log_index DESC LIMIT ?"
+            params.append(limit)
+            return [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+# ------------------- Indexer -------------------
+class ChainIndexer:
+    def __init__(
+        self,
+        db_path,
+        web3,
+        contract,
+        mode="events",
+        confirmations=0,
+        chunk_size=2000,
+        start_block=0,
+    ):
+        if mode not in ("events", "transactions"):
+            raise ValueError(f"Unknown indexer mode: {mode}")
+        self.db_path = db_path
+        self.web3 = web3
+        self.contract = contract
+        self.mode = mode
+        self.confirmations = confirmations
+        self.chunk_size = chunk_size
+        self.start_block = start_block
+        self.address = contract.address.lower()
+
+        event_abi = next(
+            (e for e in contract.abi if e.get("type") == "event" and e["name"] == "AlertLogged"),
+            None,
+        )
+        if mode == "events":
+            if event_abi is None:
+                raise ValueError("Contract ABI has no AlertLogged event; use mode='transactions'")
+            signature = "AlertLogged(%s)" % ",".join(i["type"] for i in event_abi["inputs"])
+            self.topic = self.web3.to_hex(self.web3.keccak(text=signature))
+
+        conn = _connect(db_path)
+        ensure_tables(conn)
+        conn.commit()
+        conn.close()
+
+    # ---- decoding ----
+    def _alerts_from_logs(self, from_block, to_block):
+        logs = self.web3.eth.get_logs(
+            {
+                "address": self.contract.address,
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "topics": [self.topic],
+            }
+        )
+        event = self.contract.events.AlertLogged()
+        rows = []
+        for entry in logs:
+            args = event.process_log(entry)["args"]
+            rows.append(
+                (
+                    self.web3.to_hex(entry["transactionHash"]).lower(),
+                    entry["logIndex"],
+                    args["driverId"],
+                    args["alertType"],
+                    args["alertCount"],
+                    args["driverName"],
+                    entry["blockNumber"],
+                    args["timestamp"],
+                )
+            )
+        return rows
+
+    def _alerts_from_transactions(self, from_block, to_block):
+        rows = []
+        for number in range(from_block, to_block + 1):
+            block = self.web3.eth.get_block(number, full_transactions=True)
+            for tx in block["transactions"]:
+                if (tx.get("to") or "").lower() != self.address:
+                    continue
+                receipt = self.web3.eth.get_transaction_receipt(tx["hash"])
+                if receipt["status"] != 1:
+                    continue
+                fn, args = self.contract.decode_function_input(tx["input"])
+                if fn.fn_name != "logAlert":
+                    continue
+                rows.append(
+                    (
+                        self.web3.to_hex(tx["hash"]).lower(),
+                        tx["transactionIndex"],
+                        args["driverId"],
+                        args["alertType"],
+                        args.get("alertCount"),
+                        args.get("driverName"),
+                        number,
+                        block["timestamp"],
+                    )
+                )
+        return rows
+
+    # ---- syncing ----
+    def sync_once(self):
+        """Index every confirmed block after the checkpoint. Returns alerts added."""
+        head = self.web3.eth.block_number - self.confirmations
+        conn = _connect(self.db_path)
+        added = 0
+        try:
+            checkpoint = get_checkpoint(conn)
+            next_block = self.start_block if checkpoint is None else checkpoint + 1
+            while next_block <= head:
+                to_block = min(next_block + self.chunk_size - 1, head)
+                if self.mode == "events":
+                    rows = self._alerts_from_logs(next_block, to_block)
+                else:
+                    rows = self._alerts_from_transactions(next_block, to_block)
+                # Rows and checkpoint move together, so a crash never skips blocks
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO chain_alerts (tx_hash, log_index, driver_id,"
+                        " alert_type, alert_count, driver_name, block_number, block_timestamp)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    conn.execute(
+                        "INSERT INTO chain_indexer_state (key, value) VALUES (?, ?)"
+                        " ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                        (CHECKPOINT_KEY, to_block),
+                    )
+                added += len(rows)
+                CHAIN_ALERTS_INDEXED.inc(len(rows))
+                CHAIN_INDEXED_BLOCK.set(to_block)
+                next_block = to_block + 1
+        finally:
+            conn.close()
+        if added:
+            log.info("indexed chain alerts", extra={"added": added, "through_block": head})
+        return added
+
+    def follow(self, poll_seconds=2.0, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                self.sync_once()
+            except Exception:
+                log.exception("chain indexer sync failed")
+            stop_event.wait(poll_seconds)
+
+
+def from_app_config(db_path=None, **kwargs):
+    """Indexer wired to the contract/RPC configured for blockchain_client."""
+    from blockchain_client import get_client
+
+    if db_path is None:
+        from state import DB_PATH as db_path
+    client = get_client()
+    return ChainIndexer(db_path, client.web3, client.contract, **kwargs)
+
+
+def start_background(poll_seconds=2.0, **kwargs):
+    """Run from_app_config().follow() on a daemon thread; returns the stop event."""
+    stop_event = threading.Event()
+
+    def run():
+        try:
+            indexer = from_app_config(**kwargs)
+        except Exception:
+            log.exception("chain indexer failed to start")
+            return
+        indexer.follow(poll_seconds, stop_event)
+
+    threading.Thread(target=run, name="chain-indexer", daemon=True).start()
+    return stop_event
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index AlertLogger alerts into SQLite")
+    parser.add_argument("--mode", choices=("events", "transactions"), default="events")
+    parser.add_argument("--confirmations", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--start-block", type=int, default=0)
+    parser.add_argument("--poll", type=float, default=2.0)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--once", action="store_true")
+    group.add_argument("--follow", action="store_true")
+    args = parser.parse_args()
+
+    indexer = from_app_config(
+        mode=args.mode,
+        confirmations=args.confirmations,
+        chunk_size=args.chunk_size,
+        start_block=args.start_block,
+    )
+    if args.follow:
+        indexer.follow(args.poll)
+    else:
+        added = indexer.sync_once()
+        print(f"[chain_indexer] Indexed {added} alerts.")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,22 +14,29 @@ def company_receive():
     global company_alert_logs
 
     data = request.get_json()
-    print("\n📩 Incoming alert from drowsiness system:", data)
-
-    entry = {
-        "driver_id": data.get("driver_id"),
-        "driver_name": data.get("driver_name"),
-        "alert_type": data.get("alert_type"),
-        "alert_count": data.get("alert_count"),
-        "tx_hash": data.get("tx_hash"),
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-    }
-
-    # Keep only latest 20 alerts
-    company_alert_logs.insert(0, entry)
+    # Webhook deliveries are batched: accept one alert or a list of alerts
+    alerts = data if isinstance(data, list) else [data]
+    print(f"\n📩 Incoming alerts from drowsiness system: {len(alerts)}")
+
+    received_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    entries = [
+        {
+            "driver_id": alert.get("driver_id"),
+            "driver_name": alert.get("driver_name"),
+            "alert_type": alert.get("alert_type"),
+            "alert_count": alert.get("alert_count"),
+            "tx_hash": alert.get("tx_hash"),
+            # When the alert happened; deliveries can lag it by retries and backoff
+            "timestamp": (alert.get("timestamp") or received_at).replace("T", " "),
+        }
+        for alert in alerts
+    ]
+
+    # Newest first; keep only latest 20 alerts
+    company_alert_logs = entries[::-1] + company_alert_logs
     company_alert_logs = company_alert_logs[:20]
 
-    return jsonify({"status": "saved"}), 200
+    return jsonify({"status": "saved", "received": len(entries)}), 200
 
 
 @app.route("/dashboard_data")
@@ -7,17 +7,20 @@ app = Flask(__name__)
 @app.route("/receive-alert", methods=["POST"])
 def receive_alert():
     data = request.json
+    # Webhook deliveries are batched: accept one alert or a list of alerts
+    alerts = data if isinstance(data, list) else [data]
 
-    print("\n📡 Received alert from Driver Monitoring System")
-    print(f"👤 Driver ID: {data.get('driver_id')}")
-    print(f"👤 Driver Name: {data.get('driver_name')}")
-    print(f"⚠️ Alert Type: {data.get('alert_type')}")
-    print(f"⚠️ Alert Count: {data.get('alert_count')}")
-    print(f"🧱 Blockchain Tx Hash: {data.get('tx_hash')}")
-    print(f"⏱ Timestamp: {data.get('timestamp')}")
-    print("Status: ✔ Saved for company audit\n")
+    for alert in alerts:
+        print("\n📡 Received alert from Driver Monitoring System")
+        print(f"👤 Driver ID: {alert.get('driver_id')}")
+        print(f"👤 Driver Name: {alert.get('driver_name')}")
+        print(f"⚠️ Alert Type: {alert.get('alert_type')}")
+        print(f"⚠️ Alert Count: {alert.get('alert_count')}")
+        print(f"🧱 Blockchain Tx Hash: {alert.get('tx_hash')}")
+        print(f"⏱ Timestamp: {alert.get('timestamp')}")
+        print("Status: ✔ Saved for company audit\n")
 
-    return {"status": "success", "message": "alert received"}, 200
+    return {"status": "success", "message": "alert received", "received": len(alerts)}, 200
 
 
 if __name__ == "__main__":
@@ -1,65 +1,76 @@
 import cv2
-import mediapipe as mp
-import math
+import os
 import threading
 import json
 import time
 import requests
 from playsound import playsound
-from state import alert_counts
+from log_utils import get_logger
+from detection.landmark_backends import create_backend
+from detection.features import (
+    EAR_THRESH,
+    MAR_THRESH,
+    EYE_CONSEC_FRAMES,
+    YAWN_CONSEC_FRAMES,
+    YAWN_ALERT_COUNT,
+    HEAD_TILT_ANGLE_THRESH,
+    extract_features,
+)
+from detection import telemetry
+from metrics import FRAME_STAGE_SECONDS, FRAMES_PROCESSED, DETECTOR_FPS, DETECTOR_ALERTS
+
+log = get_logger("detect_drowsiness")
 
 # ------------------- Utility Functions -------------------
-def euclidean_dist(a, b):
-    return math.hypot(a[0] - b[0], a[1] - b[1])
-
-def compute_EAR(eye_landmarks):
-    A = euclidean_dist(eye_landmarks[1], eye_landmarks[5])
-    B = euclidean_dist(eye_landmarks[2], eye_landmarks[4])
-    C = euclidean_dist(eye_landmarks[0], eye_landmarks[3])
-    return (A + B) / (2.0 * C)
-
-def compute_MAR(mouth_landmarks):
-    A = euclidean_dist(mouth_landmarks[2], mouth_landmarks[10])
-    B = euclidean_dist(mouth_landmarks[4], mouth_landmarks[8])
-    C = euclidean_dist(mouth_landmarks[0], mouth_landmarks[6])
-    return (A + B) / (2.0 * C)
-
 def play_alert(sound_file):
     threading.Thread(target=playsound, args=(sound_file,), daemon=True).start()
 
 # ------------------- Helper to Send Alert to Flask -------------------
+# Set from the backend's Retry-After when it sheds load (HTTP 429)
+backend_retry_at = 0.0
+
 def send_alert_to_backend(alert_type: str):
     """
     Send alert data to Flask backend when threshold exceeded.
     Now it automatically uses the latest registered user (no hardcoded ID).
+    Alerts are dropped locally while the backend has asked us to back off.
     """
+    global backend_retry_at
+    DETECTOR_ALERTS.inc(alert_type=alert_type)
+    if time.time() < backend_retry_at:
+        log.debug("backend busy, alert not sent", extra={"alert_type": alert_type})
+        return
     try:
         payload = {"alert_type": alert_type}  # ✅ no user_id needed
         res = requests.post("http://127.0.0.1:5000/log_alert", json=payload, timeout=2)
         if res.status_code == 200:
-            print(f"[detect_drowsiness] ✅ Logged {alert_type} alert to backend.")
+            log.debug("alert logged to backend", extra={"alert_type": alert_type})
+        elif res.status_code == 429:
+            retry_after = float(res.headers.get("Retry-After", "1"))
+            backend_retry_at = time.time() + retry_after
+            log.warning(
+                "backend shedding alerts, backing off",
+                extra={"alert_type": alert_type, "retry_after": retry_after},
+            )
         else:
-            print(f"[detect_drowsiness] ⚠️ Backend responded with {res.status_code}")
+            log.warning(
+                "backend rejected alert",
+                extra={"alert_type": alert_type, "status": res.status_code},
+            )
     except Exception as e:
-        print(f"[detect_drowsiness] ❌ Failed to log alert: {e}")
+        log.error("failed to log alert", extra={"alert_type": alert_type, "error": str(e)})
 
 # ------------------- Load Config -------------------
-with open("alert_config.json", "r") as f:
+# Resolved against the project root so the detector works from any CWD
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+with open(os.path.join(BASE_DIR, "alert_config.json"), "r") as f:
     alert_sounds = json.load(f)
 
-sleep_alert = alert_sounds["sleep_alert"]
-yawn_alert = alert_sounds["yawn_alert"]
-headtilt_alert = alert_sounds["headtilt_alert"]
+sleep_alert = os.path.join(BASE_DIR, alert_sounds["sleep_alert"])
+yawn_alert = os.path.join(BASE_DIR, alert_sounds["yawn_alert"])
+headtilt_alert = os.path.join(BASE_DIR, alert_sounds["headtilt_alert"])
 
-# ------------------- Thresholds -------------------
-EAR_THRESH = 0.21
-MAR_THRESH = 0.6
-EYE_CLOSED_SEC = 2
-EYE_FPS = 30
-EYE_CONSEC_FRAMES = EYE_CLOSED_SEC * EYE_FPS
-YAWN_CONSEC_FRAMES = 15
-YAWN_ALERT_COUNT = 2
-HEAD_TILT_ANGLE_THRESH = 25  # degrees
+NAN = float("nan")
 
 # ------------------- Counters & Timers -------------------
 ear_counter = 0
@@ -78,27 +89,42 @@ alert_color = (0, 0, 0)
 alert_bg = (0, 0, 0)
 alert_end_time = 0
 
-# ------------------- Landmark Indices -------------------
-LEFT_EYE_IDX = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE_IDX = [362, 385, 387, 263, 373, 380]
-MOUTH_IDX = [61, 81, 311, 291, 78, 308, 402, 14, 178, 88, 95]
-
-# ------------------- Mediapipe Setup -------------------
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(refine_landmarks=True)
-mp_drawing = mp.solutions.drawing_utils
+# ------------------- Landmark Backend -------------------
+# Mediapipe FaceMesh by default; see landmark_backends for LANDMARK_BACKEND
+landmark_backend = create_backend()
+
+# ------------------- Telemetry -------------------
+# Per-frame EAR/MAR/tilt ring files, off unless TELEMETRY_ENABLED=1
+telemetry_recorder = telemetry.create_recorder()
+if telemetry_recorder is not None and os.getenv("TELEMETRY_UPLOAD_URL"):
+    telemetry.start_uploader(
+        os.getenv("TELEMETRY_UPLOAD_URL"),
+        os.getenv("TELEMETRY_DEVICE_ID", "default"),
+        int(os.getenv("TELEMETRY_UPLOAD_INTERVAL_SECONDS", "60")),
+        user_id=os.getenv("TELEMETRY_USER_ID") or None,
+    )
 
 # ------------------- MAIN DETECTION FUNCTION -------------------
-def gen_frames():
-    """Generator function for Flask video streaming."""
+def gen_frames(source=0, backend=None):
+    """
+    Generator function for Flask video streaming.
+    `source` is a camera index or a video file path (used by the benchmarks);
+    `backend` overrides the module's landmark backend.
+    """
     global ear_counter, yawn_frame_counter, yawn_event_counter, yawn_in_progress
     global head_tilt_start, head_tilt_active
     global alert_message, alert_color, alert_bg, alert_end_time
     global sleep_alert_counter, yawn_alert_counter, headtilt_alert_counter
 
-    cap = cv2.VideoCapture(0)
+    cap = cv2.VideoCapture(source)
     if not cap.isOpened():
-        raise RuntimeError("Could not open webcam (check camera index).")
+        raise RuntimeError(f"Could not open video source {source!r} (check camera index).")
+
+    backend = backend or landmark_backend
+    recorder = telemetry_recorder
+    perf = time.perf_counter
+    observe_stage = FRAME_STAGE_SECONDS.observe
+    fps_window_start, fps_window_frames = perf(), 0
 
     try:
         while True:
@@ -107,19 +133,23 @@ def gen_frames():
                 break
 
             h, w, _ = frame.shape
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb_frame)
-
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
-                    landmarks = [(int(lm.x * w), int(lm.y * h)) for lm in face_landmarks.landmark]
-
-                    left_eye = [landmarks[i] for i in LEFT_EYE_IDX]
-                    right_eye = [landmarks[i] for i in RIGHT_EYE_IDX]
-                    mouth = [landmarks[i] for i in MOUTH_IDX]
-
-                    ear = (compute_EAR(left_eye) + compute_EAR(right_eye)) / 2.0
-                    mar = compute_MAR(mouth)
+            t0 = perf()
+            image = backend.prepare(frame)
+            t1 = perf()
+            faces = backend.detect(image, w, h)
+            t2 = perf()
+            observe_stage(t1 - t0, stage="color")
+            observe_stage(t2 - t1, stage="mesh")
+
+            if recorder is not None and not faces:
+                recorder.record(NAN, NAN, NAN, 0)
+
+            if faces:
+                for face in faces:
+                    flags = telemetry.FLAG_FACE
+                    t0 = perf()
+                    ear, mar, angle = extract_features(face.points)
+                    observe_stage(perf() - t0, stage="features")
 
                     # ------------------- Eyes Closed Detection -------------------
                     if ear < EAR_THRESH:
@@ -128,6 +158,7 @@ def gen_frames():
                             play_alert(sleep_alert)
                             sleep_alert_counter += 1
                             send_alert_to_backend("sleep")  # ✅ auto send to latest user
+                            flags |= telemetry.FLAG_SLEEP_ALERT
                             alert_message = "DROWSY! Eyes Closed"
                             alert_color = (255, 255, 255)
                             alert_bg = (0, 0, 255)
@@ -150,6 +181,7 @@ def gen_frames():
                         play_alert(yawn_alert)
                         yawn_alert_counter += 1
                         send_alert_to_backend("yawn")  # ✅ auto send to latest user
+                        flags |= telemetry.FLAG_YAWN_ALERT
                         alert_message = "ALERT! Too Many Yawns"
                         alert_color = (255, 255, 255)
                         alert_bg = (255, 0, 0)
@@ -157,13 +189,6 @@ def gen_frames():
                         yawn_event_counter = 0
 
                     # ------------------- Head Tilt Detection -------------------
-                    left_ear_pos = landmarks[234]
-                    right_ear_pos = landmarks[454]
-
-                    dx = right_ear_pos[0] - left_ear_pos[0]
-                    dy = right_ear_pos[1] - left_ear_pos[1]
-                    angle = math.degrees(math.atan2(dy, dx))
-
                     if abs(angle) > HEAD_TILT_ANGLE_THRESH:
                         if head_tilt_start is None:
                             head_tilt_start = time.time()
@@ -171,6 +196,7 @@ def gen_frames():
                             play_alert(headtilt_alert)
                             headtilt_alert_counter += 1
                             send_alert_to_backend("head_tilt")  # ✅ auto send to latest user
+                            flags |= telemetry.FLAG_HEAD_TILT_ALERT
                             alert_message = "HEAD TILT DETECTED!"
                             alert_color = (0, 0, 0)
                             alert_bg = (0, 255, 255)
@@ -180,8 +206,13 @@ def gen_frames():
                         head_tilt_start = None
                         head_tilt_active = False
 
+                    if recorder is not None:
+                        recorder.record(ear, mar, angle, flags)
+
                     # Draw landmarks
-                    mp_drawing.draw_landmarks(frame, face_landmarks, mp_face_mesh.FACEMESH_TESSELATION)
+                    t0 = perf()
+                    backend.draw(frame, face)
+                    observe_stage(perf() - t0, stage="draw")
 
             # ------------------- Show Alerts -------------------
             if alert_message and time.time() < alert_end_time:
@@ -191,7 +222,17 @@ def gen_frames():
                 cv2.putText(frame, alert_message, (x, y),
                             cv2.FONT_HERSHEY_SIMPLEX, 1.5, alert_color, 3)
 
+            t0 = perf()
             ret, buffer = cv2.imencode('.jpg', frame)
+            t1 = perf()
+            observe_stage(t1 - t0, stage="encode")
+
+            FRAMES_PROCESSED.inc()
+            fps_window_frames += 1
+            if t1 - fps_window_start >= 1.0:
+                DETECTOR_FPS.set(fps_window_frames / (t1 - fps_window_start))
+                fps_window_start, fps_window_frames = t1, 0
+
             if not ret:
                 continue
             yield (b'--frame\r\n'
@@ -0,0 +1,58 @@
+# detection/features.py
+"""
+EAR / MAR / head-tilt features and the detector's thresholds.
+
+Kept free of camera, sound and landmark-backend setup so benchmarks and
+tools can compute features without building the default backend.
+"""
+import math
+
+from detection.landmark_backends import LEFT_EYE_IDX, RIGHT_EYE_IDX, MOUTH_IDX, HEAD_TILT_IDX
+
+# ------------------- Thresholds -------------------
+EAR_THRESH = 0.21
+MAR_THRESH = 0.6
+EYE_CLOSED_SEC = 2
+EYE_FPS = 30
+EYE_CONSEC_FRAMES = EYE_CLOSED_SEC * EYE_FPS
+YAWN_CONSEC_FRAMES = 15
+YAWN_ALERT_COUNT = 2
+HEAD_TILT_ANGLE_THRESH = 25  # degrees
+
+# ------------------- Utility Functions -------------------
+def euclidean_dist(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+def compute_EAR(eye_landmarks):
+    A = euclidean_dist(eye_landmarks[1], eye_landmarks[5])
+    B = euclidean_dist(eye_landmarks[2], eye_landmarks[4])
+    C = euclidean_dist(eye_landmarks[0], eye_landmarks[3])
+    return (A + B) / (2.0 * C)
+
+def compute_MAR(mouth_landmarks):
+    A = euclidean_dist(mouth_landmarks[2], mouth_landmarks[10])
+    B = euclidean_dist(mouth_landmarks[4], mouth_landmarks[8])
+    C = euclidean_dist(mouth_landmarks[0], mouth_landmarks[6])
+    return (A + B) / (2.0 * C)
+
+# ------------------- Feature Extraction -------------------
+def extract_features(landmarks):
+    """
+    Compute (EAR, MAR, head tilt angle in degrees) for one face.
+    `landmarks` is anything indexable by Mediapipe landmark index that yields
+    (x, y) pixel coordinates (a full list or a {index: point} dict).
+    """
+    left_eye = [landmarks[i] for i in LEFT_EYE_IDX]
+    right_eye = [landmarks[i] for i in RIGHT_EYE_IDX]
+    mouth = [landmarks[i] for i in MOUTH_IDX]
+
+    ear = (compute_EAR(left_eye) + compute_EAR(right_eye)) / 2.0
+    mar = compute_MAR(mouth)
+
+    left_ear_pos = landmarks[HEAD_TILT_IDX[0]]
+    right_ear_pos = landmarks[HEAD_TILT_IDX[1]]
+    dx = right_ear_pos[0] - left_ear_pos[0]
+    dy = right_ear_pos[1] - left_ear_pos[1]
+    angle = math.degrees(math.atan2(dy, dx))
+
+    return ear, mar, angle
@@ -0,0 +1,188 @@
+# detection/landmark_backends.py
+"""
+Landmark providers for the drowsiness detector.
+
+Every backend returns, per frame, a list of Face(points, raw) where `points`
+maps Mediapipe landmark indices (only FEATURE_IDX) to (x, y) pixels, so
+extract_features() works unchanged whichever model produced them.
+
+  - "mediapipe"       FaceMesh with iris refinement (478 points, the default)
+  - "mediapipe-lite"  FaceMesh without refinement (468 points, cheaper)
+  - "lbf"             OpenCV Haar face detector + 68-point LBF facemark
+                      (needs opencv-contrib-python and LBF_MODEL_PATH)
+  - "replay"          recorded landmark fixture, ignores the frame pixels
+
+Pick one with LANDMARK_BACKEND=<name>.
+"""
+import json
+import os
+from collections import namedtuple
+
+import cv2
+
+# ------------------- Landmark Indices (Mediapipe numbering) -------------------
+LEFT_EYE_IDX = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE_IDX = [362, 385, 387, 263, 373, 380]
+MOUTH_IDX = [61, 81, 311, 291, 78, 308, 402, 14, 178, 88, 95]
+HEAD_TILT_IDX = [234, 454]
+# Every landmark the detector actually reads
+FEATURE_IDX = sorted(set(LEFT_EYE_IDX + RIGHT_EYE_IDX + MOUTH_IDX + HEAD_TILT_IDX))
+
+# Closest 68-point (iBUG) landmark for each Mediapipe index above
+IBUG68_TO_MEDIAPIPE = {
+    # eye on the image left: outer corner, upper lid x2, inner corner, lower lid x2
+    33: 36, 160: 37, 158: 38, 133: 39, 153: 40, 144: 41,
+    # eye on the image right: inner corner, upper lid x2, outer corner, lower lid x2
+    362: 42, 385: 43, 387: 44, 263: 45, 373: 46, 380: 47,
+    # mouth: outer corners, inner corners, inner upper / lower lip
+    61: 48, 291: 54, 78: 60, 308: 64,
+    81: 61, 311: 63, 402: 65, 14: 66, 178: 67, 88: 67, 95: 67,
+    # jaw line at ear height
+    234: 0, 454: 16,
+}
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LBF_MODEL_PATH = os.getenv("LBF_MODEL_PATH", os.path.join(BASE_DIR, "models", "lbfmodel.yaml"))
+LANDMARK_REPLAY_PATH = os.getenv(
+    "LANDMARK_REPLAY_PATH",
+    os.path.join(BASE_DIR, "benchmarks", "fixtures", "synthetic_landmarks.json"),
+)
+
+Face = namedtuple("Face", ["points", "raw"])
+
+
+class LandmarkBackend:
+    """Interface shared by the backends below."""
+
+    name = "base"
+
+    def prepare(self, frame_bgr):
+        """Convert a BGR camera frame into the model's input image."""
+        return frame_bgr
+
+    def detect(self, image, w, h):
+        """Return a list of Face for the prepared image (frame size w x h)."""
+        raise NotImplementedError
+
+    def draw(self, frame_bgr, face):
+        """Overlay one detected face on the output frame."""
+        for x, y in face.points.values():
+            cv2.circle(frame_bgr, (x, y), 1, (0, 255, 0), -1)
+
+    def close(self):
+        pass
+
+
+class MediaPipeBackend(LandmarkBackend):
+    def __init__(self, refine_landmarks=True):
+        import mediapipe as mp
+
+        self.name = "mediapipe" if refine_landmarks else "mediapipe-lite"
+        self._mp_face_mesh = mp.solutions.face_mesh
+        self._mp_drawing = mp.solutions.drawing_utils
+        self.face_mesh = self._mp_face_mesh.FaceMesh(refine_landmarks=refine_landmarks)
+
+    def prepare(self, frame_bgr):
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
+
+    def detect(self, image, w, h):
+        results = self.face_mesh.process(image)
+        if not results.multi_face_landmarks:
+            return []
+        faces = []
+        for face_landmarks in results.multi_face_landmarks:
+            lms = face_landmarks.landmark
+            # Only the points the detector reads, not all 468/478
+            points = {i: (int(lms[i].x * w), int(lms[i].y * h)) for i in FEATURE_IDX}
+            faces.append(Face(points, face_landmarks))
+        return faces
+
+    def draw(self, frame_bgr, face):
+        self._mp_drawing.draw_landmarks(
+            frame_bgr, face.raw, self._mp_face_mesh.FACEMESH_TESSELATION
+        )
+
+    def close(self):
+        self.face_mesh.close()
+
+
+class LBFBackend(LandmarkBackend):
+    """Haar cascade face box + OpenCV LBF 68-point facemark, mapped to Mediapipe indices."""
+
+    name = "lbf"
+
+    def __init__(self, model_path=LBF_MODEL_PATH, detect_width=320):
+        if not hasattr(cv2, "face"):
+            raise RuntimeError("LBF backend needs opencv-contrib-python (cv2.face).")
+        if not os.path.exists(model_path):
+            raise RuntimeError(
+                f"LBF model not found at {model_path}; download lbfmodel.yaml "
+                "and set LBF_MODEL_PATH."
+            )
+        self.detect_width = detect_width
+        self.detector = cv2.CascadeClassifier(
+            os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        )
+        self.facemark = cv2.face.createFacemarkLBF()
+        self.facemark.loadModel(model_path)
+
+    def prepare(self, frame_bgr):
+        return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+
+    def detect(self, image, w, h):
+        # Face boxes on a downscaled copy, landmarks on the full-resolution image
+        scale = min(1.0, self.detect_width / float(w))
+        small = cv2.resize(image, None, fx=scale, fy=scale) if scale < 1.0 else image
+        boxes = self.detector.detectMultiScale(small, scaleFactor=1.2, minNeighbors=5)
+        if len(boxes) == 0:
+            return []
+        boxes = (boxes / scale).astype("int32")
+        ok, shapes = self.facemark.fit(image, boxes)
+        if not ok:
+            return []
+        faces = []
+        for shape in shapes:
+            pts = shape[0]
+            points = {
+                i: (int(pts[j][0]), int(pts[j][1])) for i, j in IBUG68_TO_MEDIAPIPE.items()
+            }
+            faces.append(Face(points, shape))
+        return faces
+
+
+class ReplayBackend(LandmarkBackend):
+    """Replays a recorded landmark fixture (benchmarks/fixtures format), one face per frame."""
+
+    name = "replay"
+
+    def __init__(self, path=LANDMARK_REPLAY_PATH, loop=False):
+        with open(path, "r") as f:
+            data = json.load(f)
+        indices = data["indices"]
+        self.frames = [
+            {i: (p[0], p[1]) for i, p in zip(indices, row)} for row in data["frames"]
+        ]
+        self.loop = loop
+        self.position = 0
+
+    def detect(self, image, w, h):
+        if self.position >= len(self.frames):
+            if not self.loop or not self.frames:
+                return []
+            self.position = 0
+        points = self.frames[self.position]
+        self.position += 1
+        return [Face(points, None)]
+
+
+def create_backend(kind=None):
+    kind = (kind or os.getenv("LANDMARK_BACKEND", "mediapipe")).lower()
+    if kind == "mediapipe":
+        return MediaPipeBackend(refine_landmarks=True)
+    if kind == "mediapipe-lite":
+        return MediaPipeBackend(refine_landmarks=False)
+    if kind == "lbf":
+        return LBFBackend()
+    if kind == "replay":
+        return ReplayBackend()
+    raise ValueError(f"Unknown LANDMARK_BACKEND: {kind}")
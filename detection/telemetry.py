@@ -0,0 +1,250 @@
+# detection/telemetry.py
+"""
+Per-frame feature telemetry (EAR, MAR, head tilt) recorded on the device.
+
+Records are fixed 16-byte structs written straight into a memory-mapped,
+pre-sized chunk file, so recording a frame is one struct.pack_into():
+
+    seq      uint32   frame number within the chunk
+    t_ms     int32    ms since the chunk's start time
+    ear      float16
+    mar      float16
+    angle    float16  degrees
+    flags    uint8    FLAG_* bits below
+    (1 pad byte)
+
+Each chunk starts with a 32-byte header (magic, version, record size, start
+time in epoch ms, capacity, records written). When a chunk is full it is
+sealed (renamed to telemetry-<start_ms>.bin) and a new one is started; only
+the newest TELEMETRY_MAX_CHUNKS sealed chunks are kept, so the directory is
+a bounded ring. Sealed chunks are POSTed as-is to the backend's
+/telemetry/upload, which bulk-loads them into the frame_telemetry table.
+
+Enable with TELEMETRY_ENABLED=1; TELEMETRY_UPLOAD_URL starts the uploader.
+Uploads carry TELEMETRY_USER_ID when the device is assigned to one driver;
+otherwise frame_telemetry.user_id is left NULL.
+"""
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from log_utils import get_logger
+
+log = get_logger("telemetry")
+
+MAGIC = b"DDTL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqII8x")
+RECORD = struct.Struct("<IieeeBx")
+COUNT_OFFSET = 20  # byte offset of the record count inside HEADER
+
+FLAG_FACE = 1
+FLAG_SLEEP_ALERT = 2
+FLAG_YAWN_ALERT = 4
+FLAG_HEAD_TILT_ALERT = 8
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", os.path.join(BASE_DIR, "telemetry"))
+TELEMETRY_CHUNK_BYTES = int(os.getenv("TELEMETRY_CHUNK_BYTES", str(1024 * 1024)))
+TELEMETRY_MAX_CHUNKS = int(os.getenv("TELEMETRY_MAX_CHUNKS", "64"))
+
+ACTIVE_NAME = "current.part"
+
+
+# ------------------- Recorder (device) -------------------
+class TelemetryRecorder:
+    def __init__(self, directory=TELEMETRY_DIR, chunk_bytes=TELEMETRY_CHUNK_BYTES,
+                 max_chunks=TELEMETRY_MAX_CHUNKS):
+        self.directory = directory
+        self.capacity = max(1, (chunk_bytes - HEADER.size) // RECORD.size)
+        self.max_chunks = max_chunks
+        self._lock = threading.Lock()
+        self._mm = None
+        self._file = None
+        self.start_ms = 0
+        os.makedirs(directory, exist_ok=True)
+        # A chunk left open by a crash still has a valid count; keep it
+        if os.path.exists(self._active_path()):
+            self._seal_file(self._active_path())
+        self._open_chunk()
+
+    def _active_path(self):
+        return os.path.join(self.directory, ACTIVE_NAME)
+
+    def _open_chunk(self):
+        # Strictly increasing, so chunk names and (device, chunk) keys never collide
+        self.start_ms = max(int(time.time() * 1000), self.start_ms + 1)
+        self.seq = 0
+        size = HEADER.size + self.capacity * RECORD.size
+        self._file = open(self._active_path(), "w+b")
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, RECORD.size, self.start_ms, self.capacity, 0)
+
+    def _seal_file(self, path):
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+        try:
+            magic, _, _, start_ms, _, count = HEADER.unpack(header)
+        except struct.error:
+            magic, count = None, 0
+        if magic != MAGIC or count == 0:
+            os.remove(path)
+            return
+        os.replace(path, os.path.join(self.directory, f"telemetry-{start_ms}.bin"))
+        self._trim()
+
+    def _trim(self):
+        sealed = sealed_chunks(self.directory)
+        for path in sealed[: max(0, len(sealed) - self.max_chunks)]:
+            os.remove(path)
+
+    def _rotate(self):
+        self._close_chunk()
+        self._seal_file(self._active_path())
+        self._open_chunk()
+
+    def _close_chunk(self):
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
+
+    def record(self, ear, mar, angle, flags=FLAG_FACE):
+        """Append one frame's features (NaN for frames without a face)."""
+        with self._lock:
+            if self.seq >= self.capacity:
+                self._rotate()
+            t_ms = int(time.time() * 1000) - self.start_ms
+            RECORD.pack_into(
+                self._mm, HEADER.size + self.seq * RECORD.size,
+                self.seq, t_ms, ear, mar, angle, flags,
+            )
+            self.seq += 1
+            struct.pack_into("<I", self._mm, COUNT_OFFSET, self.seq)
+
+    def seal(self):
+        """Seal the current chunk now (e.g. before an upload or on shutdown)."""
+        with self._lock:
+            if self.seq:
+                self._rotate()
+
+    def close(self):
+        with self._lock:
+            self._close_chunk()
+            self._seal_file(self._active_path())
+
+
+def sealed_chunks(directory=TELEMETRY_DIR):
+    """Sealed chunk paths, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = [n for n in os.listdir(directory) if n.startswith("telemetry-") and n.endswith(".bin")]
+    names.sort(key=lambda n: int(n[len("telemetry-"):-len(".bin")]))
+    return [os.path.join(directory, n) for n in names]
+
+
+def create_recorder():
+    """TelemetryRecorder if TELEMETRY_ENABLED=1, else None."""
+    if os.getenv("TELEMETRY_ENABLED", "0") != "1":
+        return None
+    return TelemetryRecorder()
+
+
+# ------------------- Upload (device) -------------------
+def upload_pending(url, device_id, directory=TELEMETRY_DIR, timeout=10, user_id=None):
+    """POST every sealed chunk to the backend, deleting each once accepted."""
+    import requests
+
+    params = {"device_id": device_id}
+    if user_id:
+        params["user_id"] = user_id
+    uploaded = 0
+    for path in sealed_chunks(directory):
+        with open(path, "rb") as f:
+            data = f.read()
+        res = requests.post(
+            url,
+            params=params,
+            data=data,
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=timeout,
+        )
+        if res.status_code != 200:
+            log.warning("telemetry upload rejected", extra={"chunk": path, "status": res.status_code})
+            break
+        os.remove(path)
+        uploaded += 1
+    return uploaded
+
+
+def start_uploader(url, device_id, interval_seconds=60, directory=TELEMETRY_DIR, user_id=None):
+    """Run upload_pending() every interval on a daemon thread; returns the stop event."""
+    stop_event = threading.Event()
+
+    def loop():
+        while not stop_event.wait(interval_seconds):
+            try:
+                upload_pending(url, device_id, directory, user_id=user_id)
+            except Exception as e:
+                log.warning("telemetry upload failed", extra={"error": str(e)})
+
+    threading.Thread(target=loop, name="telemetry-uploader", daemon=True).start()
+    return stop_event
+
+
+# ------------------- Ingest (backend) -------------------
+def ensure_tables(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS frame_telemetry (
+            device_id TEXT NOT NULL,
+            chunk_start_ms INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            user_id TEXT,
+            t_ms INTEGER NOT NULL,
+            ear REAL,
+            mar REAL,
+            angle REAL,
+            flags INTEGER NOT NULL,
+            PRIMARY KEY (device_id, chunk_start_ms, seq)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_frame_telemetry_user_time
+            ON frame_telemetry(user_id, t_ms);
+        """
+    )
+
+
+def parse_chunk(data):
+    """Return (start_ms, records) for a chunk's bytes; raises ValueError if malformed."""
+    if len(data) < HEADER.size:
+        raise ValueError("chunk shorter than header")
+    magic, version, record_size, start_ms, capacity, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError("not a telemetry chunk (bad magic, version or record size)")
+    end = HEADER.size + count * RECORD.size
+    if count > capacity or end > len(data):
+        raise ValueError("chunk record count exceeds its data")
+    return start_ms, RECORD.iter_unpack(memoryview(data)[HEADER.size:end])
+
+
+def _real(value):
+    return None if math.isnan(value) else value
+
+
+def ingest_chunk(conn, device_id, data, user_id=None):
+    """Bulk insert one chunk into frame_telemetry (re-uploads are ignored). Returns rows."""
+    start_ms, records = parse_chunk(data)
+    rows = [
+        (device_id, start_ms, seq, user_id, start_ms + t_ms, _real(ear), _real(mar), _real(angle), flags)
+        for seq, t_ms, ear, mar, angle, flags in records
+    ]
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO frame_telemetry (device_id, chunk_start_ms, seq, user_id,"
+            " t_ms, ear, mar, angle, flags) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+    return len(rows)
@@ -1,7 +1,10 @@
 # email_utils.py
 import os
-import smtplib
-from email.message import EmailMessage
+
+from log_utils import get_logger
+from metrics import EMAILS_SENT, SMTP_SEND_SECONDS
+
+log = get_logger("email_utils")
 
 # ----------------------------------------------
 # 🔐 Load credentials from environment variables
@@ -9,23 +12,36 @@ from email.message import EmailMessage
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
 
-if not EMAIL_USER or not EMAIL_PASS:
-    print("⚠️ [email_utils] EMAIL_USER or EMAIL_PASS not set. Emails will not be sent.")
+# SMTP server (defaults to Gmail; override for local relays / load tests)
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
+
+_warned_missing_credentials = False
 
 # ----------------------------------------------
 # 📬 Helper function to send one email
 # ----------------------------------------------
 def send_email_notification(to_email: str, subject: str, message: str):
     """
-    Send a simple plain-text email using Gmail SMTP.
+    Send a simple plain-text email using Gmail SMTP (or SMTP_HOST/SMTP_PORT).
     Requires:
         - EMAIL_USER  (your Gmail address)
         - EMAIL_PASS  (app password)
     """
+    global _warned_missing_credentials
     if not EMAIL_USER or not EMAIL_PASS:
-        print(f"⚠️ [email_utils] Missing credentials. Skipping email to {to_email}")
+        if not _warned_missing_credentials:
+            log.warning("EMAIL_USER or EMAIL_PASS not set. Emails will not be sent.")
+            _warned_missing_credentials = True
+        log.debug("missing credentials, skipping email", extra={"to": to_email})
+        EMAILS_SENT.inc(status="skipped")
         return False
 
+    # Imported on first send: most processes never email anyone
+    import smtplib
+    from email.message import EmailMessage
+
     try:
         msg = EmailMessage()
         msg["From"] = EMAIL_USER
@@ -33,15 +49,19 @@ def send_email_notification(to_email: str, subject: str, message: str):
         msg["Subject"] = subject
         msg.set_content(message)
 
-        with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
-            smtp.starttls()
-            smtp.login(EMAIL_USER, EMAIL_PASS)
-            smtp.send_message(msg)
+        with SMTP_SEND_SECONDS.time():
+            with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as smtp:
+                if SMTP_STARTTLS:
+                    smtp.starttls()
+                smtp.login(EMAIL_USER, EMAIL_PASS)
+                smtp.send_message(msg)
 
-        print(f"✅ [email_utils] Email sent successfully to {to_email}")
+        log.info("email sent", extra={"to": to_email})
+        EMAILS_SENT.inc(status="sent")
         return True
     except Exception as e:
-        print(f"❌ [email_utils] Failed to send email to {to_email}: {e}")
+        log.error("failed to send email", extra={"to": to_email, "error": str(e)})
+        EMAILS_SENT.inc(status="failed")
         return False
 
 
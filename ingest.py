@@ -0,0 +1,208 @@
+# ingest.py
+"""
+Admission control and batched writes for /log_alert.
+
+Every alert first passes admit(), which checks in this order:
+  - the ingest queue must have room (otherwise reason "queue_full"); this
+    costs no tokens, so a full queue never drains the buckets
+  - a per-driver token bucket (INGEST_DRIVER_RATE/s, burst INGEST_DRIVER_BURST)
+    stops one misbehaving detector from flooding the backend ("driver_rate")
+  - a global token bucket (INGEST_GLOBAL_RATE/s, burst INGEST_GLOBAL_BURST)
+    caps fleet-wide bursts such as a shift start ("global_rate")
+Rejected requests get 429 with Retry-After and are counted in
+ingest_shed_total{reason}.
+
+Admitted alerts still update the threshold counters inline (state.log_alert),
+but their `alerts` rows go onto a bounded in-memory queue drained by a single
+writer thread that inserts them with executemany, one short transaction per
+batch, instead of one connection + commit per request.
+
+The inline counter is deliberate: the request needs to know at once whether
+it crossed the threshold, and with the default sqlite alert-state backend
+that answer must be exact across worker processes. So each admitted alert
+still takes one BEGIN IMMEDIATE on the app database (the counter UPSERT);
+the writer only removes the second one. ALERT_STATE_BACKEND=memory avoids
+it for single-process deployments.
+
+Limits and the queue are per worker process. Rows still queued when the
+process is killed are lost; a normal exit flushes them.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+from log_utils import get_logger
+from metrics import INGEST_BATCH_SIZE, INGEST_SHED, QUEUE_DEPTH
+
+log = get_logger("ingest")
+
+INGEST_DRIVER_RATE = float(os.getenv("INGEST_DRIVER_RATE", "5"))
+INGEST_DRIVER_BURST = float(os.getenv("INGEST_DRIVER_BURST", "20"))
+INGEST_GLOBAL_RATE = float(os.getenv("INGEST_GLOBAL_RATE", "500"))
+INGEST_GLOBAL_BURST = float(os.getenv("INGEST_GLOBAL_BURST", "1000"))
+QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "10000"))
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+LINGER_SECONDS = 0.05
+MAX_TRACKED_DRIVERS = 100000
+
+
+# ------------------- Rate Limiting -------------------
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now):
+        """Take one token. Returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class RateLimiter:
+    """Per-driver buckets plus one global bucket, behind one lock."""
+
+    def __init__(self, driver_rate=INGEST_DRIVER_RATE, driver_burst=INGEST_DRIVER_BURST,
+                 global_rate=INGEST_GLOBAL_RATE, global_burst=INGEST_GLOBAL_BURST,
+                 max_drivers=MAX_TRACKED_DRIVERS):
+        self.driver_rate = driver_rate
+        self.driver_burst = driver_burst
+        self.max_drivers = max_drivers
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self._drivers = {}
+        self._lock = threading.Lock()
+
+    def _driver_bucket(self, driver_id):
+        bucket = self._drivers.pop(driver_id, None)
+        if bucket is None:
+            bucket = TokenBucket(self.driver_rate, self.driver_burst)
+            if len(self._drivers) >= self.max_drivers:
+                # Dicts keep insertion order; the first entry is the least recently used
+                self._drivers.pop(next(iter(self._drivers)))
+        self._drivers[driver_id] = bucket
+        return bucket
+
+    def check(self, driver_id):
+        """Returns None if admitted, else (reason, retry_after_seconds)."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._driver_bucket(driver_id)
+            wait = bucket.take(now)
+            if wait:
+                return "driver_rate", wait
+            wait = self.global_bucket.take(now)
+            if wait:
+                bucket.refund()
+                return "global_rate", wait
+        return None
+
+
+# ------------------- Batched Writer -------------------
+class AlertWriter:
+    """Single background thread inserting queued alert rows in batches."""
+
+    def __init__(self, insert_rows, maxsize=QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 linger=LINGER_SECONDS):
+        self.insert_rows = insert_rows
+        self.batch_size = batch_size
+        self.linger = linger
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="alert-writer", daemon=True)
+        self._thread.start()
+
+    def has_room(self):
+        return not self.queue.full()
+
+    def submit(self, row):
+        """Queue one row; False if the queue is full (caller writes it inline)."""
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            return False
+        return True
+
+    def _drain(self, block):
+        try:
+            batch = [self.queue.get(timeout=0.5 if block else 0)]
+        except queue.Empty:
+            return []
+        # Let a burst accumulate so it lands in one transaction
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            self.insert_rows(batch)
+        except Exception:
+            log.exception("alert batch insert failed", extra={"rows": len(batch)})
+        INGEST_BATCH_SIZE.observe(len(batch))
+        QUEUE_DEPTH.set(self.queue.qsize(), queue="ingest")
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+
+    def stop(self, timeout=5):
+        """Stop the thread and write whatever is still queued."""
+        self._stop.set()
+        self._thread.join(timeout)
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                break
+            self._write(batch)
+
+
+# ------------------- Admission -------------------
+class AlertIngest:
+    def __init__(self, insert_rows, limiter=None, writer=None):
+        self.limiter = limiter or RateLimiter()
+        self.writer = writer or AlertWriter(insert_rows)
+
+    def admit(self, driver_id):
+        """None if the alert may proceed, else (reason, retry_after_seconds)."""
+        if not self.writer.has_room():
+            rejection = ("queue_full", 1.0)
+        else:
+            rejection = self.limiter.check(driver_id)
+        if rejection is not None:
+            INGEST_SHED.inc(reason=rejection[0])
+        return rejection
+
+    def submit(self, row):
+        return self.writer.submit(row)
+
+
+_ingest = None
+_ingest_lock = threading.Lock()
+
+
+def get_ingest():
+    """Shared ingest front writing through state.insert_alerts (created on first use)."""
+    global _ingest
+    if _ingest is None:
+        with _ingest_lock:
+            if _ingest is None:
+                from state import insert_alerts
+
+                _ingest = AlertIngest(insert_alerts)
+                atexit.register(_ingest.writer.stop)
+    return _ingest
@@ -0,0 +1,55 @@
+# log_utils.py
+"""
+Structured (one JSON object per line) logging for the backend and detector.
+
+    from log_utils import get_logger
+    log = get_logger(__name__)
+    log.info("alert logged", extra={"alert_type": "yawn", "count": 3})
+
+Anything passed via `extra` becomes a top-level JSON field. LOG_LEVEL sets
+the level (default INFO); per-alert / per-frame chatter is logged at DEBUG
+so it costs nothing unless asked for.
+"""
+import json
+import logging
+import os
+import sys
+
+# Attributes every LogRecord has; everything else came from `extra`
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level=None):
+    """Install the JSON handler on the root logger (idempotent)."""
+    global _configured
+    if _configured:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    _configured = True
+
+
+def get_logger(name):
+    configure_logging()
+    return logging.getLogger(name)
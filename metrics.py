@@ -0,0 +1,233 @@
+# metrics.py
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are plain Python objects guarded by one lock
+each, so recording a sample is a dict lookup plus an add. Every instrument the
+app records is declared at the bottom of this file; app.py serves them at
+/metrics via render().
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+_REGISTRY = []
+
+# Default latency buckets (seconds): 0.5 ms .. 10 s
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_label_str(self.labelnames, key)} {_fmt(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self):
+        with self._lock:
+            return sum(self._values.values())
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket (non-cumulative) counts + one overflow slot, sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][idx] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = [(k, (list(v[0]), v[1])) for k, v in self._values.items()]
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = f'le="{_fmt(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {running}")
+            labels = _label_str(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt(total)}")
+            lines.append(f"{self.name}_count{labels} {running}")
+        return lines
+
+
+def render():
+    """Return every registered metric in Prometheus text format (0.0.4)."""
+    lines = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ------------------- Detector -------------------
+FRAME_STAGE_SECONDS = Histogram(
+    "detector_frame_stage_seconds",
+    "Time spent per frame in each detector stage.",
+    ["stage"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+             0.025, 0.05, 0.1, 0.25, 0.5),
+)
+FRAMES_PROCESSED = Counter("detector_frames_total", "Frames processed by the detector.")
+DETECTOR_FPS = Gauge("detector_fps", "Detector throughput over the last second.")
+DETECTOR_ALERTS = Counter(
+    "detector_alerts_total", "Alerts raised by the detector.", ["alert_type"]
+)
+
+# ------------------- Backend -------------------
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "Flask request latency.", ["endpoint", "status"]
+)
+ALERTS_RECEIVED = Counter(
+    "alerts_received_total", "Alerts received on /log_alert.", ["alert_type"]
+)
+ALERT_THRESHOLD_TRIGGERS = Counter(
+    "alert_threshold_triggers_total", "Alert threshold crossings.", ["alert_type"]
+)
+DB_QUERY_SECONDS = Histogram("db_query_seconds", "SQLite query latency.", ["query"])
+TELEMETRY_RECORDS_INGESTED = Counter(
+    "telemetry_records_ingested_total", "Per-frame telemetry records received from detectors."
+)
+ALERTS_ARCHIVED = Counter(
+    "alerts_archived_total", "Alert rows moved from the database into the archive."
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups by outcome.", ["cache", "result"]
+)
+
+# ------------------- Outbound -------------------
+BLOCKCHAIN_TX_SECONDS = Histogram(
+    "blockchain_tx_seconds", "Time to build, sign and submit an alert transaction."
+)
+BLOCKCHAIN_TX_FAILURES = Counter(
+    "blockchain_tx_failures_total", "Alert transactions that failed to submit."
+)
+CHAIN_ALERTS_INDEXED = Counter(
+    "chain_alerts_indexed_total", "Alerts added to the local chain index."
+)
+CHAIN_INDEXED_BLOCK = Gauge(
+    "chain_indexed_block", "Last block included in the local chain index."
+)
+SMTP_SEND_SECONDS = Histogram("smtp_send_seconds", "Time to deliver one email over SMTP.")
+EMAILS_SENT = Counter("emails_sent_total", "Email notification attempts.", ["status"])
+WEBHOOK_DELIVERIES = Counter(
+    "webhook_deliveries_total",
+    "Webhook batch deliveries by outcome (delivered, retry, dead).",
+    ["subscriber", "result"],
+)
+WEBHOOK_EVENTS = Counter(
+    "webhook_events_delivered_total", "Events delivered to webhook subscribers.", ["subscriber"]
+)
+WEBHOOK_DELIVERY_SECONDS = Histogram(
+    "webhook_delivery_seconds", "Latency of one webhook batch POST.", ["subscriber"]
+)
+WEBHOOK_BATCH_SIZE = Histogram(
+    "webhook_batch_size",
+    "Events per webhook delivery.",
+    ["subscriber"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+# ------------------- Queues -------------------
+QUEUE_DEPTH = Gauge("queue_depth", "Items waiting in internal queues.", ["queue"])
+INGEST_SHED = Counter(
+    "ingest_shed_total", "Alerts rejected by admission control (429).", ["reason"]
+)
+INGEST_BATCH_SIZE = Histogram(
+    "ingest_batch_size",
+    "Alert rows per batched insert.",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
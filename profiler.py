@@ -0,0 +1,77 @@
+# profiler.py
+"""
+On-demand sampling profiler for the running process.
+
+sample() polls sys._current_frames() every `interval` seconds for the given
+duration and counts identical stacks; collapse() renders them in the
+"frame;frame;frame count" format understood by flamegraph.pl, speedscope
+and inferno. Nothing runs between requests, so a disabled (or idle)
+profiler costs nothing.
+
+Exposed by app.py at /debug/profile when PROFILER_ENABLED=1.
+"""
+import os
+import sys
+import threading
+import time
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "0") == "1"
+MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+MIN_INTERVAL = 0.001
+
+_busy = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is already being taken."""
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample(seconds, interval=0.005, match=None):
+    """
+    Sample every thread's stack for `seconds`. If `match` is given, only
+    stacks containing a function with that name (e.g. "gen_frames") or
+    from a thread with that name are kept. Returns {stack_tuple: count}.
+    """
+    seconds = max(0.0, min(float(seconds), MAX_SECONDS))
+    interval = max(float(interval), MIN_INTERVAL)
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("a profile is already running")
+
+    counts = {}
+    me = threading.get_ident()
+    try:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame)
+                    frame = frame.f_back
+                thread_name = names.get(ident, str(ident))
+                if match and match != thread_name and not any(
+                    f.f_code.co_name == match for f in stack
+                ):
+                    continue
+                key = (thread_name,) + tuple(_frame_label(f) for f in reversed(stack))
+                counts[key] = counts.get(key, 0) + 1
+            time.sleep(interval)
+    finally:
+        _busy.release()
+    return counts
+
+
+def collapse(counts):
+    """Render sample counts as collapsed stacks (one "a;b;c N" per line)."""
+    lines = [
+        ";".join(part.replace(";", ":") for part in stack) + f" {n}"
+        for stack, n in sorted(counts.items(), key=lambda kv: -kv[1])
+    ]
+    return "\n".join(lines) + ("\n" if lines else "")
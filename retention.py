@@ -0,0 +1,305 @@
+# retention.py
+"""
+Retention for the `alerts` table.
+
+Alerts older than ALERT_RETENTION_DAYS are moved out of the hot database in
+small batches: each batch is appended to a per-month archive file
+(archive/alerts-YYYY-MM.ndjson.gz, one gzip member per batch), then rolled
+into the `alert_daily_counts` aggregate table and deleted in one short
+transaction, so writers are never blocked for long.
+
+If the process dies between the archive write and the commit the batch is
+archived again on the next run; readers de-duplicate archived rows by id
+and the aggregates are only ever bumped together with the delete.
+
+query_alerts() spans both: archived months overlapping the requested range
+plus the hot table, merged in timestamp order, skipping hot rows that were
+already archived.
+
+    python retention.py                 # archive everything past retention
+    python retention.py --days 7
+"""
+import argparse
+import gzip
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from log_utils import get_logger
+from metrics import ALERTS_ARCHIVED, DB_QUERY_SECONDS
+
+log = get_logger("retention")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ALERT_RETENTION_DAYS = int(os.getenv("ALERT_RETENTION_DAYS", "30"))
+ARCHIVE_DIR = os.getenv("ALERT_ARCHIVE_DIR", os.path.join(BASE_DIR, "database", "archive"))
+BATCH_SIZE = 1000
+BATCH_PAUSE_SECONDS = 0.05
+
+
+def ensure_tables(conn):
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS alert_daily_counts (
+            day TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            alert_type TEXT NOT NULL,
+            alerts INTEGER NOT NULL,
+            PRIMARY KEY (day, user_id, alert_type)
+        );
+        CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts(timestamp);
+        """
+    )
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout = 10000;")
+    return conn
+
+
+def archive_path(month, archive_dir=ARCHIVE_DIR):
+    return os.path.join(archive_dir, f"alerts-{month}.ndjson.gz")
+
+
+# ------------------- Archiving -------------------
+def archive_batch(conn, cutoff, archive_dir=ARCHIVE_DIR, batch_size=BATCH_SIZE):
+    """Archive, aggregate and delete up to batch_size alerts older than cutoff."""
+    rows = conn.execute(
+        """
+        SELECT a.id, a.session_id, s.user_id, a.alert_type, a.timestamp, a.count
+        FROM alerts a
+        LEFT JOIN sessions s ON s.id = a.session_id
+        WHERE a.timestamp < ?
+        ORDER BY a.timestamp
+        LIMIT ?
+        """,
+        (cutoff, batch_size),
+    ).fetchall()
+    if not rows:
+        return 0
+
+    by_month, daily = {}, {}
+    for r in rows:
+        ts = str(r["timestamp"])
+        by_month.setdefault(ts[:7], []).append(dict(r))
+        key = (ts[:10], r["user_id"] or "", r["alert_type"])
+        daily[key] = daily.get(key, 0) + 1
+
+    # 1) durable archive first ...
+    os.makedirs(archive_dir, exist_ok=True)
+    for month, records in by_month.items():
+        with open(archive_path(month, archive_dir), "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+                for rec in records:
+                    gz.write((json.dumps(rec, default=str) + "\n").encode())
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    # 2) ... then aggregates + delete in one short transaction
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO alert_daily_counts (day, user_id, alert_type, alerts)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(day, user_id, alert_type) DO UPDATE SET alerts = alerts + excluded.alerts
+            """,
+            [(d, u, t, n) for (d, u, t), n in daily.items()],
+        )
+        conn.executemany("DELETE FROM alerts WHERE id = ?", [(r["id"],) for r in rows])
+    ALERTS_ARCHIVED.inc(len(rows))
+    return len(rows)
+
+
+def run_once(db_path, retention_days=ALERT_RETENTION_DAYS, archive_dir=ARCHIVE_DIR,
+             batch_size=BATCH_SIZE, pause=BATCH_PAUSE_SECONDS, stop_event=None):
+    """Archive every alert past retention, one batch at a time. Returns rows moved."""
+    cutoff = str(datetime.now() - timedelta(days=retention_days))
+    conn = _connect(db_path)
+    total = 0
+    try:
+        ensure_tables(conn)
+        while stop_event is None or not stop_event.is_set():
+            moved = archive_batch(conn, cutoff, archive_dir, batch_size)
+            total += moved
+            if moved < batch_size:
+                break
+            time.sleep(pause)  # let foreground writers in between batches
+    finally:
+        conn.close()
+    if total:
+        log.info("archived alerts", extra={"rows": total, "cutoff": cutoff})
+    return total
+
+
+def start_background(db_path, interval_seconds=3600, **kwargs):
+    """Run run_once() every interval on a daemon thread; returns the stop event."""
+    stop_event = threading.Event()
+
+    def loop():
+        while not stop_event.is_set():
+            try:
+                run_once(db_path, stop_event=stop_event, **kwargs)
+            except Exception:
+                log.exception("alert retention run failed")
+            stop_event.wait(interval_seconds)
+
+    threading.Thread(target=loop, name="alert-retention", daemon=True).start()
+    return stop_event
+
+
+# ------------------- Querying -------------------
+def parse_timestamp(value):
+    """
+    Parse an ISO date/datetime ("2025-01-31", "2025-01-31T08:00") into the
+    naive local datetime alerts are stored with. Raises ValueError.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value))
+    if parsed.tzinfo is not None:
+        raise ValueError("timestamps must be local time without a UTC offset")
+    return parsed
+
+
+def _month_range(start, end):
+    """YYYY-MM strings from start's month to end's month (inclusive)."""
+    y, m = int(start[:4]), int(start[5:7])
+    ey, em = int(end[:4]), int(end[5:7])
+    while (y, m) <= (ey, em):
+        yield f"{y:04d}-{m:02d}"
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+def _matches(rec, start, end, user_id, alert_type):
+    ts = rec["timestamp"]
+    return (
+        (start is None or ts >= start)
+        and (end is None or ts < end)
+        and (user_id is None or rec["user_id"] == user_id)
+        and (alert_type is None or rec["alert_type"] == alert_type)
+    )
+
+
+def _archived(start, end, user_id, alert_type, archive_dir, archived_ids, hot_floor):
+    """
+    Archived alerts in timestamp order, one month file at a time. Ids of
+    archived rows at or after hot_floor (the oldest hot timestamp) go into
+    archived_ids: those rows may still be in the hot table after a crash.
+    """
+    if os.path.isdir(archive_dir):
+        months = sorted(
+            f[len("alerts-"):-len(".ndjson.gz")]
+            for f in os.listdir(archive_dir)
+            if f.startswith("alerts-") and f.endswith(".ndjson.gz")
+        )
+    else:
+        months = []
+    if months and (start or end):
+        wanted = set(_month_range(start or months[0], end or months[-1]))
+        months = [m for m in months if m in wanted]
+
+    for month in months:
+        seen, records = set(), []
+        with gzip.open(archive_path(month, archive_dir), "rt") as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec["id"] in seen or not _matches(rec, start, end, user_id, alert_type):
+                    continue
+                seen.add(rec["id"])
+                records.append(rec)
+                if hot_floor is not None and rec["timestamp"] >= hot_floor:
+                    archived_ids.add(rec["id"])
+        records.sort(key=lambda r: r["timestamp"])
+        yield from records
+
+
+def _hot(conn, start, end, user_id, alert_type):
+    sql = """
+        SELECT a.id, a.session_id, s.user_id, a.alert_type, a.timestamp, a.count
+        FROM alerts a
+        LEFT JOIN sessions s ON s.id = a.session_id
+        WHERE 1 = 1
+    """
+    params = []
+    for clause, value in (
+        (" AND a.timestamp >= ?", start),
+        (" AND a.timestamp < ?", end),
+        (" AND s.user_id = ?", user_id),
+        (" AND a.alert_type = ?", alert_type),
+    ):
+        if value is not None:
+            sql += clause
+            params.append(value)
+    # Execute now (so callers can time it); rows are fetched as they are consumed
+    return _rows(conn.execute(sql + " ORDER BY a.timestamp", params))
+
+
+def _rows(cur):
+    while True:
+        rows = cur.fetchmany(1000)
+        if not rows:
+            return
+        for r in rows:
+            rec = dict(r)
+            rec["timestamp"] = str(rec["timestamp"])
+            yield rec
+
+
+def query_alerts(db_path, start=None, end=None, user_id=None, alert_type=None,
+                 archive_dir=ARCHIVE_DIR):
+    """
+    Yield alert dicts (id, session_id, user_id, alert_type, timestamp, count)
+    in timestamp order from the archive and the hot table. start/end are
+    datetimes or ISO strings (see parse_timestamp); end is exclusive. Rows
+    archived but not yet deleted (a crash mid-batch) are returned once.
+    """
+    start = str(parse_timestamp(start)) if start is not None else None
+    end = str(parse_timestamp(end)) if end is not None else None
+    conn = _connect(db_path)
+    try:
+        # Times the SQL only, not the streaming of results to the client
+        with DB_QUERY_SECONDS.time(query="query_alerts"):
+            (hot_floor,) = conn.execute("SELECT MIN(timestamp) FROM alerts").fetchone()
+            hot = _hot(conn, start, end, user_id, alert_type)
+        hot_floor = str(hot_floor) if hot_floor is not None else None
+        archived_ids = set()
+        merged = heapq.merge(
+            ((rec, False) for rec in _archived(
+                start, end, user_id, alert_type, archive_dir, archived_ids, hot_floor
+            )),
+            ((rec, True) for rec in hot),
+            key=lambda item: item[0]["timestamp"],
+        )
+        # Ties go to the archive (first iterable), so an archived copy is
+        # always emitted, and its id recorded, before the hot duplicate
+        for rec, is_hot in merged:
+            if is_hot and rec["id"] in archived_ids:
+                continue
+            yield rec
+    finally:
+        conn.close()
+
+
+def main():
+    from state import DB_PATH
+
+    parser = argparse.ArgumentParser(description="Archive old alerts")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--days", type=int, default=ALERT_RETENTION_DAYS)
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    moved = run_once(args.db, args.days, args.archive_dir, args.batch_size)
+    print(f"[retention] Archived {moved} alerts to {args.archive_dir}")
+
+
+if __name__ == "__main__":
+    main()
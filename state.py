@@ -4,10 +4,17 @@ import os
 import uuid
 from datetime import datetime
 
+import cache
+from alert_state import create_backend
+from log_utils import get_logger
+from metrics import ALERT_THRESHOLD_TRIGGERS, DB_QUERY_SECONDS
+
+log = get_logger("state")
+
 # ------------------------------
-# Global in-memory alert counts
+# Alert types counted towards the threshold
 # ------------------------------
-alert_counts = {"yawn": 0, "sleep": 0, "head_tilt": 0}
+ALERT_TYPES = ("yawn", "sleep", "head_tilt")
 
 # ------------------------------
 # Threshold for triggering alerts
@@ -17,7 +24,16 @@ ALERT_THRESHOLD = 5
 # ------------------------------
 # Database path
 # ------------------------------
-DB_PATH = os.path.join(os.getcwd(), "database", "driver_drowsiness.db")
+# Same file as app.py (override with DB_PATH, e.g. for load tests)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.getenv(
+    "DB_PATH", os.path.join(BASE_DIR, "database", "driver_drowsiness.db")
+)
+
+# ------------------------------
+# Shared counters / cooldowns / latest user (see alert_state.py)
+# ------------------------------
+alert_state = create_backend(DB_PATH)
 
 
 def get_db_connection():
@@ -27,82 +43,120 @@ def get_db_connection():
 
 
 def get_active_session(user_id: str):
+    session_id = cache.active_sessions.get(user_id)
+    if session_id is not None:
+        return session_id
+
     conn = get_db_connection()
     c = conn.cursor()
-    c.execute("SELECT id FROM sessions WHERE user_id = ? AND is_active = 1", (user_id,))
-    row = c.fetchone()
+    with DB_QUERY_SECONDS.time(query="get_active_session"):
+        c.execute(
+            "SELECT id FROM sessions WHERE user_id = ? AND is_active = 1", (user_id,)
+        )
+        row = c.fetchone()
 
     if row:
         session_id = row["id"]
     else:
         session_id = str(uuid.uuid4())
-        c.execute(
-            "INSERT INTO sessions (id, user_id, start_time, is_active) VALUES (?, ?, ?, 1)",
-            (session_id, user_id, datetime.now()),
-        )
-        conn.commit()
+        with DB_QUERY_SECONDS.time(query="insert_session"):
+            c.execute(
+                "INSERT INTO sessions (id, user_id, start_time, is_active) VALUES (?, ?, ?, 1)",
+                (session_id, user_id, datetime.now()),
+            )
+            conn.commit()
 
     conn.close()
+    cache.active_sessions.set(user_id, session_id)
     return session_id
 
 
+def _load_user_profile(user_id: str):
+    conn = get_db_connection()
+    c = conn.cursor()
+    try:
+        with DB_QUERY_SECONDS.time(query="get_user_profile"):
+            c.execute("SELECT full_name FROM users WHERE id = ?", (user_id,))
+            user_row = c.fetchone()
+            if not user_row:
+                return None
+            c.execute("SELECT name, email FROM contacts WHERE user_id = ?", (user_id,))
+            contacts = [
+                {"name": row["name"], "email": row["email"]} for row in c.fetchall()
+            ]
+        return user_row["full_name"], contacts
+    finally:
+        conn.close()
+
+
+def get_user_profile(user_id: str):
+    """
+    Return (driver_name, contacts) for a driver, or None if unknown.
+    Served from cache.user_profiles after the first lookup.
+    """
+    return cache.user_profiles.get_or_load(user_id, _load_user_profile)
+
+
 def get_driver_name(user_id: str) -> str:
     """
     Fetch driver_name from database by user_id.
     Returns 'Unknown Driver' if not found.
     """
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT full_name FROM users WHERE id = ?", (user_id,))
-    result = cursor.fetchone()
-    conn.close()
-
-    if result:
-        return result[0]
+    profile = get_user_profile(user_id)
+    if profile:
+        return profile[0]
     else:
         return "Unknown Driver"
 
 
-def log_alert(user_id: str, alert_type: str):
-    if alert_type not in alert_counts:
-        print(f"[state.py] ⚠️ Unknown alert type: {alert_type}")
-        return False
-
-    alert_counts[alert_type] += 1
-    print(f"[state.py] 🔄 {alert_type} count updated to {alert_counts[alert_type]}")
-
-    session_id = get_active_session(user_id)
+def insert_alerts(rows):
+    """Insert (id, session_id, alert_type, timestamp, count) rows in one transaction."""
     conn = get_db_connection()
-    c = conn.cursor()
-
     try:
-        alert_id = str(uuid.uuid4())
-        c.execute(
-            "INSERT INTO alerts (id, session_id, alert_type, timestamp, count) VALUES (?, ?, ?, ?, ?)",
-            (
-                alert_id,
-                session_id,
-                alert_type,
-                datetime.now(),
-                alert_counts[alert_type],
-            ),
-        )
-        conn.commit()
-    except Exception as e:
-        print(f"[state.py] ❌ Error logging alert: {e}")
+        with DB_QUERY_SECONDS.time(query="insert_alert"):
+            with conn:
+                conn.executemany(
+                    "INSERT INTO alerts (id, session_id, alert_type, timestamp, count) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
     finally:
         conn.close()
 
-    if alert_counts[alert_type] >= ALERT_THRESHOLD:
-        print(
-            f"[state.py] 🚨 {alert_type.upper()} threshold exceeded! Trigger notification."
-        )
-        alert_counts[alert_type] = 0
+
+def log_alert(user_id: str, alert_type: str, writer=None):
+    """
+    Bump the shared counter for alert_type and record the alert row. The
+    counter/threshold check is always inline (one write transaction with the
+    sqlite backend; see ingest.py); the row goes through `writer`
+    (ingest.AlertIngest) when given, else it is inserted immediately.
+    """
+    if alert_type not in ALERT_TYPES:
+        log.warning("unknown alert type", extra={"alert_type": alert_type})
+        return False
+
+    with DB_QUERY_SECONDS.time(query="increment_alert_count"):
+        count, triggered = alert_state.increment(alert_type, ALERT_THRESHOLD)
+    log.debug("alert count updated", extra={"alert_type": alert_type, "count": count})
+
+    row = (str(uuid.uuid4()), get_active_session(user_id), alert_type, datetime.now(), count)
+    if writer is None or not writer.submit(row):
+        try:
+            insert_alerts([row])
+        except Exception as e:
+            log.error("error logging alert", extra={"error": str(e)})
+
+    if triggered:
+        log.info("alert threshold exceeded", extra={"alert_type": alert_type})
+        ALERT_THRESHOLD_TRIGGERS.inc(alert_type=alert_type)
         return True
     return False
 
 
+def get_alert_counts():
+    """Current per-type counts (shared across worker processes)."""
+    return alert_state.counts(ALERT_TYPES)
+
+
 def reset_alert_counts():
-    for key in alert_counts:
-        alert_counts[key] = 0
-    print("[state.py] ✅ Alert counts reset.")
+    alert_state.reset()
+    log.info("alert counts reset")
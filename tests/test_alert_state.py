@@ -0,0 +1,54 @@
+# tests/test_alert_state.py
+"""SQLiteAlertState shared across processes: threshold counters and cooldowns."""
+import multiprocessing
+
+import alert_state
+
+THRESHOLD = 5
+PROCESSES = 4
+INCREMENTS_PER_PROCESS = 250
+
+
+def _increment_many(db_path, n):
+    state = alert_state.SQLiteAlertState(db_path)
+    return sum(state.increment("yawn", THRESHOLD)[1] for _ in range(n))
+
+
+def _claim(db_path, key):
+    return alert_state.SQLiteAlertState(db_path).acquire_cooldown(key, 600)
+
+
+def test_threshold_crossings_are_exact_across_processes(tmp_path):
+    db_path = str(tmp_path / "state.db")
+    alert_state.SQLiteAlertState(db_path)  # create tables and switch to WAL once
+
+    with multiprocessing.Pool(PROCESSES) as pool:
+        crossings = pool.starmap(
+            _increment_many, [(db_path, INCREMENTS_PER_PROCESS)] * PROCESSES
+        )
+
+    total = PROCESSES * INCREMENTS_PER_PROCESS
+    assert sum(crossings) == total // THRESHOLD
+    assert alert_state.SQLiteAlertState(db_path).counts(["yawn"]) == {"yawn": total % THRESHOLD}
+
+
+def test_cooldown_is_claimed_by_exactly_one_process(tmp_path):
+    db_path = str(tmp_path / "state.db")
+    alert_state.SQLiteAlertState(db_path)
+
+    with multiprocessing.Pool(PROCESSES) as pool:
+        claimed = pool.starmap(_claim, [(db_path, "u1:sleep")] * (PROCESSES * 2))
+
+    assert claimed.count(True) == 1
+
+
+def test_cooldown_expires_and_can_be_released(tmp_path):
+    state = alert_state.SQLiteAlertState(str(tmp_path / "state.db"))
+
+    assert state.acquire_cooldown("u1:yawn", 600)
+    assert not state.acquire_cooldown("u1:yawn", 600)
+    assert state.acquire_cooldown("u1:yawn", 0)  # window already over
+    assert state.acquire_cooldown("u2:yawn", 600)  # keys are independent
+
+    state.release_cooldown("u1:yawn")
+    assert state.acquire_cooldown("u1:yawn", 600)
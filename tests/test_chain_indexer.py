@@ -0,0 +1,221 @@
+# tests/test_chain_indexer.py
+"""
+chain_indexer against chain fixtures served by a stub web3.eth.
+
+The behavioural tests run on the scripted synthetic chain. The end-to-end
+checks also run on every other benchmarks/fixtures/*chain*.json, e.g. one
+written from Hardhat by benchmarks/record_chain.py.
+"""
+import glob
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+web3 = pytest.importorskip("web3")
+from hexbytes import HexBytes  # noqa: E402
+from web3 import Web3  # noqa: E402
+from web3.datastructures import AttributeDict  # noqa: E402
+
+import chain_indexer  # noqa: E402
+from benchmarks.fixtures import CONTRACT_INFO_PATH, FIXTURES_DIR, load_chain  # noqa: E402
+
+CHAIN_FIXTURES = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*chain*.json")))
+
+
+class FixtureEth:
+    """The parts of web3.eth the indexer uses, answered from a chain fixture."""
+
+    def __init__(self, chain, head=None):
+        self.chain = chain
+        self.block_number = chain["head"] if head is None else head
+        self.blocks = {b["number"]: b for b in chain["blocks"]}
+        self.log_ranges = []
+        self.blocks_read = []
+
+    def get_logs(self, params):
+        lo, hi = params["fromBlock"], params["toBlock"]
+        self.log_ranges.append((lo, hi))
+        topics = [t.lower() for t in params.get("topics") or []]
+        out = []
+        for entry in self.chain["logs"]:
+            if not lo <= entry["blockNumber"] <= hi:
+                continue
+            if entry["address"].lower() != params["address"].lower():
+                continue
+            if topics and entry["topics"][0].lower() != topics[0]:
+                continue
+            out.append(
+                AttributeDict(
+                    {
+                        **entry,
+                        "topics": [HexBytes(t) for t in entry["topics"]],
+                        "data": HexBytes(entry["data"]),
+                        "blockHash": HexBytes(entry["blockHash"]),
+                        "transactionHash": HexBytes(entry["transactionHash"]),
+                    }
+                )
+            )
+        return out
+
+    def get_block(self, number, full_transactions=False):
+        assert number <= self.block_number, "indexer read past the head"
+        self.blocks_read.append(number)
+        block = self.blocks[number]
+        txs = [
+            AttributeDict({**tx, "hash": HexBytes(tx["hash"]), "input": HexBytes(tx["input"])})
+            for tx in block["transactions"]
+        ]
+        return AttributeDict({**block, "transactions": txs})
+
+    def get_transaction_receipt(self, tx_hash):
+        return AttributeDict(self.chain["receipts"][Web3.to_hex(tx_hash)])
+
+
+@pytest.fixture
+def chain():
+    return load_chain()
+
+
+@pytest.fixture(params=CHAIN_FIXTURES, ids=os.path.basename)
+def any_chain(request):
+    return load_chain(request.param)
+
+
+def contract_for(chain):
+    with open(CONTRACT_INFO_PATH, "r") as f:
+        info = json.load(f)
+    return Web3().eth.contract(address=chain["contract_address"], abi=info["abi"])
+
+
+@pytest.fixture
+def contract(chain):
+    return contract_for(chain)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "chain.db")
+
+
+def make_indexer(db_path, chain, contract, head=None, **kwargs):
+    stub = SimpleNamespace(eth=FixtureEth(chain, head), to_hex=Web3.to_hex, keccak=Web3.keccak)
+    # Recordings may start after block 0
+    kwargs.setdefault("start_block", chain["blocks"][0]["number"])
+    return chain_indexer.ChainIndexer(db_path, stub, contract, **kwargs)
+
+
+def alert_logs(chain):
+    return {entry["transactionHash"]: entry for entry in chain["logs"]}
+
+
+@pytest.mark.parametrize("mode", ["events", "transactions"])
+def test_sync_once_indexes_every_successful_alert(db_path, any_chain, mode):
+    chain = any_chain
+    indexer = make_indexer(db_path, chain, contract_for(chain), mode=mode)
+
+    assert indexer.sync_once() == len(chain["logs"])
+    assert indexer.sync_once() == 0  # nothing new, nothing duplicated
+
+    for tx_hash, entry in alert_logs(chain).items():
+        alert, indexed_through = chain_indexer.find_alert(db_path, tx_hash)
+        assert alert is not None
+        assert alert["block_number"] == entry["blockNumber"]
+        assert indexed_through == chain["head"]
+
+
+def test_transactions_mode_skips_failed_and_unrelated_transactions(db_path, any_chain):
+    chain = any_chain
+    make_indexer(db_path, chain, contract_for(chain), mode="transactions").sync_once()
+
+    logged = set(alert_logs(chain))
+    for block in chain["blocks"]:
+        for tx in block["transactions"]:
+            alert, _ = chain_indexer.find_alert(db_path, tx["hash"])
+            assert (alert is not None) == (tx["hash"] in logged)
+
+
+def _indexed_rows(path):
+    # log_index is left out: transactions mode stores the transaction index
+    conn = chain_indexer._connect(path)
+    try:
+        return [
+            tuple(r)
+            for r in conn.execute(
+                "SELECT tx_hash, driver_id, alert_type, alert_count, driver_name,"
+                " block_number, block_timestamp FROM chain_alerts ORDER BY tx_hash"
+            )
+        ]
+    finally:
+        conn.close()
+
+
+def test_events_and_transactions_modes_agree(tmp_path, any_chain):
+    chain = any_chain
+    rows = {}
+    for mode in ("events", "transactions"):
+        path = str(tmp_path / f"{mode}.db")
+        make_indexer(path, chain, contract_for(chain), mode=mode).sync_once()
+        rows[mode] = _indexed_rows(path)
+    assert rows["events"] == rows["transactions"]
+    assert len(rows["events"]) == len(chain["logs"])
+
+
+def test_sync_resumes_from_checkpoint(db_path, chain, contract):
+    first = make_indexer(db_path, chain, contract, head=3)
+    assert first.sync_once() == 2  # alerts in blocks 2 and 3
+
+    second = make_indexer(db_path, chain, contract, chunk_size=2)
+    assert second.sync_once() == len(chain["logs"]) - 2
+    # Restarted from the block after the checkpoint, in chunk_size ranges
+    assert second.web3.eth.log_ranges == [(4, 5), (6, 7)]
+
+
+def test_confirmations_hold_back_recent_blocks(db_path, chain, contract):
+    indexer = make_indexer(db_path, chain, contract, mode="transactions", confirmations=3)
+
+    assert indexer.sync_once() == 2  # head 7 - 3 confirmations = through block 4
+    assert max(indexer.web3.eth.blocks_read) == chain["head"] - 3
+    _, indexed_through = chain_indexer.find_alert(db_path, "0x00")
+    assert indexed_through == chain["head"] - 3
+
+
+def test_find_alert_checks_driver_and_normalizes_hash(db_path, chain, contract):
+    make_indexer(db_path, chain, contract).sync_once()
+    entry = chain["logs"][0]
+    tx_hash = entry["transactionHash"]
+
+    alert, _ = chain_indexer.find_alert(db_path, tx_hash.upper().replace("0X", "0x"), "driver-1")
+    assert alert["driver_id"] == "driver-1"
+    assert alert["alert_type"] == "yawn"
+    assert chain_indexer.find_alert(db_path, tx_hash, "driver-2")[0] is None
+    assert chain_indexer.find_alert(db_path, "0x" + "00" * 32)[0] is None
+
+
+def test_alerts_for_driver_pages_newest_first_without_gaps(db_path, chain, contract):
+    make_indexer(db_path, chain, contract).sync_once()
+    # Extra alerts sharing a block, so a page can end partway through it
+    conn = chain_indexer._connect(db_path)
+    with conn:
+        conn.executemany(
+            "INSERT INTO chain_alerts (tx_hash, log_index, driver_id, alert_type,"
+            " alert_count, driver_name, block_number, block_timestamp)"
+            " VALUES (?, ?, 'driver-1', 'yawn', 5, 'Asha', 6, 0)",
+            [("0xaa", 1), ("0xab", 2)],
+        )
+    conn.close()
+
+    everything = chain_indexer.alerts_for_driver(db_path, "driver-1", limit=100)
+    keys = [(a["block_number"], a["log_index"]) for a in everything]
+    assert keys == sorted(keys, reverse=True)
+
+    paged, before = [], None
+    while True:
+        page = chain_indexer.alerts_for_driver(db_path, "driver-1", limit=2, before=before)
+        paged.extend(page)
+        if len(page) < 2:
+            break
+        before = (page[-1]["block_number"], page[-1]["log_index"])
+    assert [a["tx_hash"] for a in paged] == [a["tx_hash"] for a in everything]
+    assert len(paged) == 5
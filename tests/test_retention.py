@@ -0,0 +1,68 @@
+# tests/test_retention.py
+"""retention.query_alerts across the monthly archive and the hot table."""
+import pytest
+
+import retention
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / "alerts.db")
+    conn = retention._connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE sessions (id TEXT PRIMARY KEY, user_id TEXT NOT NULL);
+        CREATE TABLE alerts (
+            id TEXT PRIMARY KEY, session_id TEXT NOT NULL, alert_type TEXT NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP, count INTEGER DEFAULT 1
+        );
+        INSERT INTO sessions VALUES ('s1', 'u1');
+        """
+    )
+    retention.ensure_tables(conn)
+    conn.executemany(
+        "INSERT INTO alerts (id, session_id, alert_type, timestamp) VALUES (?, 's1', 'yawn', ?)",
+        [
+            ("a1", "2025-01-05 10:00:00"),
+            ("a2", "2025-01-06 10:00:00"),
+            ("a3", "2025-02-01 09:00:00"),
+        ],
+    )
+    conn.commit()
+    yield path, conn
+    conn.close()
+
+
+def _ids(rows):
+    return [r["id"] for r in rows]
+
+
+def test_query_merges_archive_and_hot_in_order(db, tmp_path):
+    path, conn = db
+    archive_dir = str(tmp_path / "archive")
+    assert retention.archive_batch(conn, "2025-01-06 00:00:00", archive_dir) == 1
+
+    assert _ids(retention.query_alerts(path, archive_dir=archive_dir)) == ["a1", "a2", "a3"]
+    assert _ids(
+        retention.query_alerts(path, start="2025-01-05T12:00", end="2025-02-01", archive_dir=archive_dir)
+    ) == ["a2"]
+
+
+def test_rows_archived_but_not_deleted_are_returned_once(db, tmp_path):
+    path, conn = db
+    archive_dir = str(tmp_path / "archive")
+    retention.archive_batch(conn, "2025-01-07 00:00:00", archive_dir)
+    # Crash after the archive write: put a2 back into the hot table
+    conn.execute(
+        "INSERT INTO alerts (id, session_id, alert_type, timestamp)"
+        " VALUES ('a2', 's1', 'yawn', '2025-01-06 10:00:00')"
+    )
+    conn.commit()
+
+    assert _ids(retention.query_alerts(path, archive_dir=archive_dir)) == ["a1", "a2", "a3"]
+
+
+@pytest.mark.parametrize("value", ["bogus", "2025", "2025-01-06T00:00+01:00"])
+def test_parse_timestamp_rejects_bad_input(value):
+    with pytest.raises(ValueError):
+        retention.parse_timestamp(value)
@@ -0,0 +1,95 @@
+# tests/test_telemetry.py
+"""Telemetry chunks: recorder -> parse_chunk -> ingest_chunk."""
+import math
+import sqlite3
+
+import pytest
+
+from detection import telemetry
+
+NAN = float("nan")
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    telemetry.ensure_tables(conn)
+    yield conn
+    conn.close()
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_round_trip_keeps_values_and_nan(tmp_path, conn):
+    recorder = telemetry.TelemetryRecorder(str(tmp_path))
+    recorder.record(0.25, 0.5, -12.0)
+    recorder.record(NAN, NAN, NAN, flags=0)
+    recorder.record(0.125, 0.75, 30.0, telemetry.FLAG_FACE | telemetry.FLAG_SLEEP_ALERT)
+    recorder.close()
+
+    (path,) = telemetry.sealed_chunks(str(tmp_path))
+    data = _read(path)
+    start_ms, records = telemetry.parse_chunk(data)
+    records = list(records)
+    assert [r[0] for r in records] == [0, 1, 2]
+    assert records[0][2:] == (0.25, 0.5, -12.0, telemetry.FLAG_FACE)
+    assert all(math.isnan(v) for v in records[1][2:5])
+
+    assert telemetry.ingest_chunk(conn, "dev", data, user_id="u1") == 3
+    rows = conn.execute(
+        "SELECT chunk_start_ms, seq, user_id, ear, mar, angle, flags FROM frame_telemetry ORDER BY seq"
+    ).fetchall()
+    assert rows[0] == (start_ms, 0, "u1", 0.25, 0.5, -12.0, telemetry.FLAG_FACE)
+    assert rows[1] == (start_ms, 1, "u1", None, None, None, 0)
+    assert rows[2][-1] == telemetry.FLAG_FACE | telemetry.FLAG_SLEEP_ALERT
+
+
+def test_rotation_seals_full_chunks_and_keeps_the_newest(tmp_path, conn):
+    chunk_bytes = telemetry.HEADER.size + 4 * telemetry.RECORD.size
+    recorder = telemetry.TelemetryRecorder(str(tmp_path), chunk_bytes=chunk_bytes, max_chunks=2)
+    for i in range(14):
+        recorder.record(i / 100, 0.0, 0.0)
+    recorder.close()
+
+    # 4 + 4 + 4 + 2 records; the oldest chunk was trimmed from the ring
+    chunks = telemetry.sealed_chunks(str(tmp_path))
+    assert len(chunks) == 2
+    counts = [telemetry.ingest_chunk(conn, "dev", _read(p)) for p in chunks]
+    assert counts == [4, 2]
+    starts = [s for (s,) in conn.execute("SELECT DISTINCT chunk_start_ms FROM frame_telemetry")]
+    assert len(starts) == 2
+
+
+def test_reupload_is_ignored(tmp_path, conn):
+    recorder = telemetry.TelemetryRecorder(str(tmp_path))
+    recorder.record(0.3, 0.1, 1.0)
+    recorder.record(0.3, 0.1, 1.0)
+    recorder.close()
+    data = _read(telemetry.sealed_chunks(str(tmp_path))[0])
+
+    telemetry.ingest_chunk(conn, "dev", data)
+    telemetry.ingest_chunk(conn, "dev", data)
+    assert conn.execute("SELECT COUNT(*) FROM frame_telemetry").fetchone() == (2,)
+
+
+def test_crashed_chunk_is_sealed_on_restart(tmp_path):
+    recorder = telemetry.TelemetryRecorder(str(tmp_path))
+    recorder.record(0.3, 0.1, 1.0)
+    recorder._mm.flush()  # the process dies here without close()
+
+    telemetry.TelemetryRecorder(str(tmp_path)).close()
+    (path,) = telemetry.sealed_chunks(str(tmp_path))
+    _, records = telemetry.parse_chunk(_read(path))
+    assert len(list(records)) == 1
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"", b"NOPE" + bytes(60), telemetry.HEADER.pack(telemetry.MAGIC, 1, 16, 0, 4, 9) + bytes(64)],
+)
+def test_malformed_chunks_are_rejected(data):
+    with pytest.raises(ValueError):
+        telemetry.parse_chunk(data)
@@ -0,0 +1,194 @@
+# user_import.py
+"""
+Driver validation and bulk import (CSV or NDJSON).
+
+NDJSON: one /add_user payload per line
+    {"user_info": {"full_name": ..., "age": ..., "email": ..., "phone": ...},
+     "contacts": [{"name": ..., "relation": ..., "email": ..., "phone": ...}]}
+
+CSV: one contact per row; consecutive rows with the same driver
+(full_name, email, phone) are merged into one driver
+    full_name,age,email,phone,contact_name,contact_relation,contact_email,contact_phone
+
+CLI:
+    python user_import.py drivers.csv
+    python user_import.py drivers.ndjson --batch-size 10000
+"""
+import argparse
+import csv
+import json
+import sqlite3
+import uuid
+
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 100
+REQUIRED_USER_FIELDS = ("full_name", "age", "email", "phone")
+
+INSERT_USER_SQL = """
+    INSERT INTO users (id, full_name, age, email, phone)
+    VALUES (?, ?, ?, ?, ?)
+"""
+INSERT_CONTACT_SQL = """
+    INSERT INTO contacts (id, user_id, name, relation, email, phone)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+
+# ------------------- Validation -------------------
+def validate_user(user_info, contacts):
+    """Return an error message for an invalid driver record, else None."""
+    if not isinstance(user_info, dict) or contacts is None:
+        return "Invalid payload"
+    if not all(user_info.get(k) for k in REQUIRED_USER_FIELDS):
+        return "User info fields missing"
+    try:
+        int(user_info["age"])
+    except (TypeError, ValueError):
+        return "Age must be a number"
+    if not isinstance(contacts, list) or len(contacts) < 1:
+        return "At least one emergency contact required"
+    if not all(isinstance(c, dict) for c in contacts):
+        return "Contacts must be objects"
+    return None
+
+
+# ------------------- Parsers -------------------
+# Both yield (line_number, user_info, contacts); malformed records come back
+# with user_info=None so validate_user() rejects them without stopping.
+def parse_ndjson(lines):
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            yield lineno, None, None
+            continue
+        if not isinstance(record, dict):
+            yield lineno, None, None
+            continue
+        yield lineno, record.get("user_info"), record.get("contacts")
+
+
+def parse_csv(lines):
+    reader = csv.DictReader(lines)
+    current_key, current, start = None, None, None
+    for row in reader:
+        lineno = reader.line_num
+        user_info = {k: (row.get(k) or "").strip() for k in REQUIRED_USER_FIELDS}
+        key = (user_info["full_name"], user_info["email"], user_info["phone"])
+        contact = {
+            "name": row.get("contact_name"),
+            "relation": row.get("contact_relation"),
+            "email": row.get("contact_email"),
+            "phone": row.get("contact_phone"),
+        }
+        if key != current_key:
+            if current is not None:
+                yield start, current[0], current[1]
+            current_key, current, start = key, (user_info, []), lineno
+        if any(contact.values()):
+            current[1].append(contact)
+    if current is not None:
+        yield start, current[0], current[1]
+
+
+def parse(lines, fmt):
+    if fmt == "csv":
+        return parse_csv(lines)
+    if fmt == "ndjson":
+        return parse_ndjson(lines)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+# ------------------- Bulk insert -------------------
+def bulk_insert(conn, records, batch_size=BATCH_SIZE, max_errors=MAX_REPORTED_ERRORS):
+    """
+    Validate and insert (line, user_info, contacts) records with executemany,
+    `batch_size` drivers at a time, all in one transaction: if anything fails
+    (including decoding or parsing the input) nothing is imported.
+    Returns (inserted_count, rejected_count, first max_errors
+    [{"line": n, "error": msg}, ...]).
+    """
+    inserted, rejected, errors = 0, 0, []
+    users, contacts_rows = [], []
+
+    def flush():
+        conn.executemany(INSERT_USER_SQL, users)
+        conn.executemany(INSERT_CONTACT_SQL, contacts_rows)
+
+    with conn:
+        for lineno, user_info, contacts in records:
+            error = validate_user(user_info, contacts)
+            if error:
+                rejected += 1
+                if len(errors) < max_errors:
+                    errors.append({"line": lineno, "error": error})
+                continue
+
+            user_id = str(uuid.uuid4())
+            users.append(
+                (
+                    user_id,
+                    user_info["full_name"],
+                    int(user_info["age"]),
+                    user_info["email"],
+                    user_info["phone"],
+                )
+            )
+            for contact in contacts:
+                contacts_rows.append(
+                    (
+                        str(uuid.uuid4()),
+                        user_id,
+                        contact.get("name"),
+                        contact.get("relation"),
+                        contact.get("email"),
+                        contact.get("phone"),
+                    )
+                )
+
+            if len(users) >= batch_size:
+                flush()
+                inserted += len(users)
+                users, contacts_rows = [], []
+
+        if users:
+            flush()
+            inserted += len(users)
+    return inserted, rejected, errors
+
+
+def guess_format(name):
+    return "csv" if name.lower().endswith(".csv") else "ndjson"
+
+
+def main():
+    from state import DB_PATH
+
+    parser = argparse.ArgumentParser(description="Bulk import drivers and contacts")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    fmt = args.format or guess_format(args.path)
+    conn = sqlite3.connect(args.db)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    try:
+        with open(args.path, "r", newline="", encoding="utf-8") as f:
+            inserted, rejected, errors = bulk_insert(
+                conn, parse(f, fmt), args.batch_size, max_errors=20
+            )
+    finally:
+        conn.close()
+
+    for r in errors:
+        print(f"[user_import] line {r['line']}: {r['error']}")
+    print(f"[user_import] Inserted {inserted} drivers, rejected {rejected} into {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# webhooks.py
+"""
+Outbound webhook delivery for alert summaries.
+
+publish(event) writes one row per subscriber into a persistent outbox table
+(webhook_outbox, in the app database) and wakes the background workers, one
+thread per subscriber so a slow or failing endpoint never delays the others.
+Each worker claims its subscriber's due rows, POSTs them as one JSON array
+over a pooled keep-alive session, deletes them on 2xx and otherwise reschedules
+them with exponential backoff until max_attempts, after which they are kept
+with status 'dead' for inspection.
+
+Subscribers and tuning live in webhook_config.json. Claims are leases
+(next_attempt_at pushed into the future inside BEGIN IMMEDIATE), so several
+worker processes can share the outbox and a crashed worker's rows are
+picked up again once the lease expires.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from log_utils import get_logger
+from metrics import (
+    QUEUE_DEPTH,
+    WEBHOOK_BATCH_SIZE,
+    WEBHOOK_DELIVERIES,
+    WEBHOOK_DELIVERY_SECONDS,
+    WEBHOOK_EVENTS,
+)
+
+log = get_logger("webhooks")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.getenv("WEBHOOK_CONFIG", os.path.join(BASE_DIR, "webhook_config.json"))
+
+DEFAULTS = {
+    "subscribers": [],
+    "batch_size": 50,
+    "linger_seconds": 0.2,
+    "timeout_seconds": 3,
+    "max_attempts": 8,
+    "max_backoff_seconds": 300,
+}
+
+
+def load_config(path=CONFIG_PATH):
+    config = dict(DEFAULTS)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            config.update(json.load(f))
+    return config
+
+
+class WebhookDispatcher:
+    def __init__(self, db_path, config):
+        self.db_path = db_path
+        self.config = config
+        self.subscribers = {s["name"]: s for s in config["subscribers"]}
+        self._local = threading.local()
+        self._wake = {name: threading.Event() for name in self.subscribers}
+        self._stop = threading.Event()
+        self._threads = None
+        self._start_lock = threading.Lock()
+        self._sessions = {name: self._make_session() for name in self.subscribers}
+
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS webhook_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                subscriber TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_webhook_outbox_due
+                ON webhook_outbox(subscriber, status, next_attempt_at);
+            """
+        )
+
+    def _make_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=10)
+            conn.execute("PRAGMA busy_timeout = 10000;")
+            self._local.conn = conn
+        return conn
+
+    def _executemany(self, sql, rows):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(sql, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ------------------- Producer side -------------------
+    def publish(self, event):
+        """Queue `event` (a JSON-serializable dict) for every subscriber."""
+        if not self.subscribers:
+            return
+        now = time.time()
+        payload = json.dumps(event)
+        self._executemany(
+            "INSERT INTO webhook_outbox (subscriber, payload, next_attempt_at, created_at)"
+            " VALUES (?, ?, ?, ?)",
+            [(name, payload, now, now) for name in self.subscribers],
+        )
+        self.start()
+        for wake in self._wake.values():
+            wake.set()
+
+    def start(self):
+        if self._threads is not None:
+            return
+        with self._start_lock:
+            if self._threads is None:
+                threads = [
+                    threading.Thread(
+                        target=self._run, args=(name,), name=f"webhook-{name}", daemon=True
+                    )
+                    for name in self.subscribers
+                ]
+                for thread in threads:
+                    thread.start()
+                self._threads = threads
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        for wake in self._wake.values():
+            wake.set()
+        for thread in self._threads or []:
+            thread.join(timeout)
+
+    # ------------------- Worker side -------------------
+    def _run(self, name):
+        wake = self._wake[name]
+        while not self._stop.is_set():
+            wake.wait(timeout=1.0)
+            wake.clear()
+            # Let a burst accumulate so it goes out as one batch
+            time.sleep(self.config["linger_seconds"])
+            try:
+                while self._deliver_due(name) and not self._stop.is_set():
+                    pass
+                self._update_depth()
+            except Exception:
+                log.exception("webhook dispatcher iteration failed", extra={"subscriber": name})
+
+    def _claim(self, subscriber):
+        conn = self._conn()
+        now = time.time()
+        # Plain read first so an idle poll never takes the database write lock
+        due = conn.execute(
+            "SELECT 1 FROM webhook_outbox"
+            " WHERE subscriber = ? AND status = 'pending' AND next_attempt_at <= ? LIMIT 1",
+            (subscriber, now),
+        ).fetchone()
+        if due is None:
+            return []
+        lease = now + self.config["timeout_seconds"] * 2 + 5
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                """
+                SELECT id, payload, attempts FROM webhook_outbox
+                WHERE subscriber = ? AND status = 'pending' AND next_attempt_at <= ?
+                ORDER BY id LIMIT ?
+                """,
+                (subscriber, now, self.config["batch_size"]),
+            ).fetchall()
+            if rows:
+                conn.executemany(
+                    "UPDATE webhook_outbox SET next_attempt_at = ? WHERE id = ?",
+                    [(lease, r[0]) for r in rows],
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _deliver_due(self, name):
+        """Deliver one batch for subscriber `name`; True if it had work."""
+        rows = self._claim(name)
+        if not rows:
+            return False
+        self._deliver(name, self.subscribers[name], rows)
+        return True
+
+    def _deliver(self, name, sub, rows):
+        body = "[" + ",".join(r[1] for r in rows) + "]"
+        error = None
+        t0 = time.perf_counter()
+        try:
+            res = self._sessions[name].post(
+                sub["url"],
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=self.config["timeout_seconds"],
+            )
+            if res.status_code >= 300:
+                error = f"HTTP {res.status_code}"
+        except requests.RequestException as e:
+            error = str(e)
+        WEBHOOK_DELIVERY_SECONDS.observe(time.perf_counter() - t0, subscriber=name)
+
+        if error is None:
+            self._executemany("DELETE FROM webhook_outbox WHERE id = ?", [(r[0],) for r in rows])
+            WEBHOOK_DELIVERIES.inc(subscriber=name, result="delivered")
+            WEBHOOK_EVENTS.inc(len(rows), subscriber=name)
+            WEBHOOK_BATCH_SIZE.observe(len(rows), subscriber=name)
+            log.debug("webhook batch delivered", extra={"subscriber": name, "events": len(rows)})
+            return
+
+        now = time.time()
+        updates, dead = [], 0
+        for row_id, _, attempts in rows:
+            attempts += 1
+            if attempts >= self.config["max_attempts"]:
+                status, dead = "dead", dead + 1
+            else:
+                status = "pending"
+            backoff = min(2 ** attempts, self.config["max_backoff_seconds"])
+            updates.append((status, attempts, now + backoff, error, row_id))
+        self._executemany(
+            "UPDATE webhook_outbox SET status = ?, attempts = ?, next_attempt_at = ?,"
+            " last_error = ? WHERE id = ?",
+            updates,
+        )
+        if dead < len(rows):
+            WEBHOOK_DELIVERIES.inc(subscriber=name, result="retry")
+        if dead:
+            WEBHOOK_DELIVERIES.inc(subscriber=name, result="dead")
+        log.warning(
+            "webhook delivery failed",
+            extra={"subscriber": name, "events": len(rows), "error": error, "dead": dead},
+        )
+
+    def _update_depth(self):
+        (pending,) = self._conn().execute(
+            "SELECT COUNT(*) FROM webhook_outbox WHERE status = 'pending'"
+        ).fetchone()
+        QUEUE_DEPTH.set(pending, queue="webhook_outbox")
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Shared dispatcher on the app database (created at app startup or first use)."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                from state import DB_PATH
+
+                _dispatcher = WebhookDispatcher(DB_PATH, load_config())
+                # Pick up anything left in the outbox by a previous run
+                _dispatcher.start()
+    return _dispatcher
+
+
+def publish(event):
+    get_dispatcher().publish(event)